@@ -0,0 +1,99 @@
+import re
+import pandas as pd
+
+# Variant terms for each common allergen, so a profile entry of "milk" also
+# catches items labelled with lactose, whey and so on
+ALLERGEN_MAPPINGS = {
+    'milk': ['lactose', 'dairy', 'milk', 'casein', 'whey'],
+    'wheat': ['gluten', 'wheat', 'flour', 'barley', 'rye'],
+    'eggs': ['egg', 'eggs', 'albumin'],
+    'peanuts': ['peanut', 'peanuts', 'groundnut'],
+    'tree nuts': ['nuts', 'almond', 'walnut', 'cashew', 'pecan', 'hazelnut'],
+    'soy': ['soy', 'soya', 'soybean', 'lecithin'],
+    'fish': ['fish', 'salmon', 'tuna', 'cod'],
+    'shellfish': ['shellfish', 'shrimp', 'crab', 'lobster', 'clam'],
+    'sesame': ['sesame', 'tahini'],
+    'corn': ['corn', 'maize', 'corn syrup'],
+    'sulfites': ['sulfite', 'sulfites', 'sulphite'],
+    'mustard': ['mustard'],
+    'celery': ['celery'],
+    'lupin': ['lupin', 'lupine']
+}
+
+# Separators between the allergens listed on one item
+ALLERGEN_SEPARATORS = re.compile(r'[,;]')
+
+
+def expand_allergen_terms(allergens):
+    """Expand a user's allergens to the set of terms that should flag an item"""
+    terms = set()
+    for allergen in allergens:
+        user_allergen = str(allergen).lower().strip()
+        terms.add(user_allergen)
+        for variants in ALLERGEN_MAPPINGS.values():
+            if user_allergen in variants or any(variant in user_allergen for variant in variants):
+                terms.update(variants)
+    return frozenset(terms)
+
+
+def tokenize_allergens(text):
+    """Split a normalized allergens string into its token set"""
+    tokens = frozenset(token.strip() for token in ALLERGEN_SEPARATORS.split(text) if token.strip())
+    return tokens or frozenset([text])
+
+
+class AllergenIndex:
+    """Token set per pantry row plus an inverted index from allergen token to row labels
+
+    A term matches a token when it is a substring of it, which is the same
+    test the old per-item scan ran against the whole allergens string. None
+    of the mapped variants contain a separator, so checking tokens instead of
+    whole strings finds the same items. The substring test runs once per distinct
+    token rather than once per item.
+    """
+
+    def __init__(self, column='allergens'):
+        self.column = column
+        self.item_tokens = {}
+        self.postings = {}
+
+    def clear(self):
+        """Drop every indexed row"""
+        self.item_tokens = {}
+        self.postings = {}
+
+    def _normalized(self, frame):
+        """Get the lowercased allergens of the rows that list any"""
+        if self.column not in frame.columns:
+            return pd.Series(dtype=object)
+        values = frame[self.column]
+        values = values[values.notna()].astype(str).str.lower().str.strip()
+        return values[(values != '') & (values != 'nan')]
+
+    def add(self, frame):
+        """Index rows, tokenizing each distinct allergens string once"""
+        values = self._normalized(frame)
+        for text, labels in values.groupby(values, sort=False).groups.items():
+            tokens = tokenize_allergens(text)
+            for label in labels:
+                self.item_tokens[label] = tokens
+            for token in tokens:
+                self.postings.setdefault(token, set()).update(labels)
+
+    def remove(self, frame):
+        """Unindex rows"""
+        for label in frame.index:
+            for token in self.item_tokens.pop(label, ()):
+                postings = self.postings.get(token)
+                if postings is not None:
+                    postings.discard(label)
+                    if not postings:
+                        del self.postings[token]
+
+    def match(self, terms):
+        """Get the labels of rows whose allergens contain any of the terms"""
+        matched = set()
+        for token, labels in self.postings.items():
+            if token in terms or any(term in token for term in terms):
+                matched |= labels
+        return matched
@@ -1,20 +1,40 @@
 import os
 import logging
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from datetime import datetime
-import pandas as pd
 from data_manager import DataManager
 from pantry_manager import PantryManager
+from table_cache import table_cache
+from categorizer import categorizer
+from serialization import PantryJSONProvider
+from pantry_import import import_format
+import instrumentation
 
-# Setup logging
-logging.basicConfig(level=logging.DEBUG)
+# Setup logging, at INFO unless LOG_LEVEL says otherwise
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_development")
+# Encode every jsonify response NaN-safely, with orjson when it is installed
+app.json = PantryJSONProvider(app)
+# Time every request by stage for the Server-Timing header and /metrics
+instrumentation.install(app)
 
-# Initialize data manager
-data_manager = DataManager()
-pantry_manager = PantryManager()
+# Orders shown per page of order history
+ORDERS_PAGE_SIZE = 20
+
+# Largest page a client can ask the paged routes for
+MAX_PAGE_SIZE = 200
+
+# Recent orders offered in the pantry dashboard's order picker
+DASHBOARD_ORDERS = 20
+
+# Initialize data manager, except in the workbook parse workers loader_pool spawns,
+# which re-import the entry script as __mp_main__ and only ever parse workbooks
+if __name__ != '__mp_main__':
+    data_manager = DataManager()
+    pantry_manager = PantryManager()
+    # Keep the dashboard's expiring items precomputed in the background
+    pantry_manager.start_expiry_sweeper()
 
 @app.route('/')
 def index():
@@ -35,8 +55,7 @@ def add_to_cart():
         quantity = int(request.form.get('quantity', 1))
         
         # Get product details
-        products = data_manager.get_products()
-        product = next((p for p in products if p['id'] == product_id), None)
+        product = data_manager.get_product(product_id)
         
         if not product:
             flash('Product not found.', 'error')
@@ -143,9 +162,9 @@ def checkout():
             
             # Add ordered items to pantry
             cart_items = []
-            for product_name, item in cart.items():
+            for item in cart.values():
                 cart_items.append({
-                    'product_name': product_name,
+                    'product_name': item['name'],
                     'quantity': item['quantity'],
                     'price': item['price'],
                     'image': item.get('image', '')
@@ -175,9 +194,9 @@ def orders():
     """Display order history"""
     try:
         logging.debug("Attempting to get orders...")
-        orders = data_manager.get_orders()
+        orders, next_cursor = data_manager.get_order_page(ORDERS_PAGE_SIZE, request.args.get('cursor'))
         logging.debug(f"Successfully retrieved {len(orders)} orders")
-        return render_template('orders.html', orders=orders)
+        return render_template('orders.html', orders=orders, next_cursor=next_cursor)
     except Exception as e:
         logging.error(f"Error loading orders: {e}")
         import traceback
@@ -185,6 +204,20 @@ def orders():
         flash('Error loading orders. Please try again.', 'error')
         return render_template('orders.html', orders=[])
 
+@app.route('/orders/page')
+def orders_page():
+    """Get one page of order history, newest first"""
+    try:
+        limit = request.args.get('limit', ORDERS_PAGE_SIZE, type=int)
+        if limit <= 0:
+            return jsonify({'orders': [], 'next_cursor': None, 'error': 'limit must be a positive number'}), 400
+        limit = min(limit, MAX_PAGE_SIZE)
+        orders, next_cursor = data_manager.get_order_page(limit, request.args.get('cursor'))
+        return jsonify({'orders': orders, 'next_cursor': next_cursor})
+    except Exception as e:
+        logging.error(f"Error getting orders page: {e}")
+        return jsonify({'orders': [], 'next_cursor': None})
+
 @app.route('/get_cart_count')
 def get_cart_count():
     """Get cart item count for navbar"""
@@ -196,54 +229,20 @@ def get_cart_count():
 def pantry_dashboard():
     """Display pantry dashboard"""
     try:
-        # Get data for dashboard
-        logging.debug("Getting pantry items...")
-        pantry_items = pantry_manager.get_pantry_items()
-        logging.debug(f"Got {len(pantry_items)} pantry items")
-        
-        logging.debug("Getting expiring items...")
-        expiring_items = pantry_manager.get_expiring_items(days=7)
-        logging.debug(f"Got {len(expiring_items)} expiring items")
-        
-        logging.debug("Getting quick use items...")
-        quick_use_items = pantry_manager.get_quick_use_items()
-        logging.debug(f"Got {len(quick_use_items)} quick use items")
-        
-        logging.debug("Getting user allergens...")
-        user_allergens = pantry_manager.get_user_allergens()
-        logging.debug(f"Got {len(user_allergens)} user allergens")
-        
-        logging.debug("Getting warranty items...")
-        warranty_items = pantry_manager.get_warranty_items()
-        logging.debug(f"Got {len(warranty_items)} warranty items")
-        
-        # Get order history for restock suggestions and order selection
-        logging.debug("Getting orders...")
-        orders = data_manager.get_orders()
-        logging.debug(f"Got {len(orders)} orders")
-        
-        logging.debug("Generating restock suggestions...")
-        restock_suggestions = pantry_manager.generate_restock_suggestions(orders)
-        logging.debug(f"Got {len(restock_suggestions)} restock suggestions")
-        
-        logging.debug("Getting nutrition highlights...")
-        nutrition_highlights = pantry_manager.get_nutrition_highlights()
-        logging.debug(f"Got {len(nutrition_highlights)} nutrition highlights")
+        # Recent orders for order selection and purchase history for restock suggestions,
+        # loaded alongside the pantry sources
+        dashboard = pantry_manager.build_dashboard(
+            lambda: data_manager.get_orders(limit=DASHBOARD_ORDERS),
+            data_manager.get_purchase_history,
+            days=7
+        )
         
         # Define storage tags
         storage_tags = ['Refrigerator', 'Freezer', 'Pantry', 'Counter', 'Cupboard', 'Cellar']
         
-        logging.debug("Rendering template...")
         return render_template('pantry_dashboard.html',
-                             pantry_items=pantry_items,
-                             expiring_items=expiring_items,
-                             quick_use_items=quick_use_items,
-                             user_allergens=user_allergens,
-                             warranty_items=warranty_items,
-                             restock_suggestions=restock_suggestions,
-                             nutrition_highlights=nutrition_highlights,
                              storage_tags=storage_tags,
-                             orders=orders)
+                             **dashboard)
     except Exception as e:
         import traceback
         logging.error(f"Error loading pantry dashboard: {e}")
@@ -253,15 +252,35 @@ def pantry_dashboard():
 
 @app.route('/pantry/add_item', methods=['POST'])
 def add_pantry_item():
-    """Add item to pantry"""
+    """Add an item, or a list of items, to pantry"""
     try:
         item_data = request.get_json()
-        success = pantry_manager.add_pantry_item(item_data)
+        if isinstance(item_data, list):
+            success = pantry_manager.add_pantry_items(item_data)
+        else:
+            success = pantry_manager.add_pantry_item(item_data)
         return jsonify({'success': success})
     except Exception as e:
         logging.error(f"Error adding pantry item: {e}")
         return jsonify({'success': False})
 
+@app.route('/pantry/import', methods=['POST'])
+def import_pantry_items():
+    """Bulk import pantry items from an uploaded CSV or XLSX file"""
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'success': False, 'error': 'No file uploaded'})
+        file_format = import_format(request.form.get('format') or upload.filename)
+        strict = request.form.get('strict', '').lower() in ('1', 'true', 'yes')
+        report = pantry_manager.import_pantry_file(upload.stream, file_format, strict)
+        return jsonify({'success': 'error' not in report, **report})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)})
+    except Exception as e:
+        logging.error(f"Error importing pantry items: {e}")
+        return jsonify({'success': False})
+
 @app.route('/pantry/filter_by_tag')
 def filter_by_storage_tag():
     """Filter pantry items by storage tag"""
@@ -291,13 +310,8 @@ def remove_allergen():
     try:
         data = request.get_json()
         allergen = data.get('allergen', '')
-        
-        # Read current allergens and remove the specified one
-        df = pd.read_excel(pantry_manager.allergens_file, engine='openpyxl')
-        df = df[df['allergen'] != allergen]
-        df.to_excel(pantry_manager.allergens_file, index=False, engine='openpyxl')
-        
-        return jsonify({'success': True})
+        success = pantry_manager.remove_allergen(allergen)
+        return jsonify({'success': success})
     except Exception as e:
         logging.error(f"Error removing allergen: {e}")
         return jsonify({'success': False})
@@ -306,74 +320,9 @@ def remove_allergen():
 def get_allergen_items():
     """Get pantry items that contain user allergens"""
     try:
-        user_allergens = pantry_manager.get_user_allergens()
-        pantry_items = pantry_manager.get_pantry_items()
-        
-        if not user_allergens:
-            return jsonify({'items': []})
+        items_with_allergens = pantry_manager.get_allergen_items()
         
-        # Create mapping for allergen variants
-        allergen_mappings = {
-            'milk': ['lactose', 'dairy', 'milk', 'casein', 'whey'],
-            'wheat': ['gluten', 'wheat', 'flour', 'barley', 'rye'],
-            'eggs': ['egg', 'eggs', 'albumin'],
-            'peanuts': ['peanut', 'peanuts', 'groundnut'],
-            'tree nuts': ['nuts', 'almond', 'walnut', 'cashew', 'pecan', 'hazelnut'],
-            'soy': ['soy', 'soya', 'soybean', 'lecithin'],
-            'fish': ['fish', 'salmon', 'tuna', 'cod'],
-            'shellfish': ['shellfish', 'shrimp', 'crab', 'lobster', 'clam'],
-            'sesame': ['sesame', 'tahini'],
-            'corn': ['corn', 'maize', 'corn syrup'],
-            'sulfites': ['sulfite', 'sulfites', 'sulphite'],
-            'mustard': ['mustard'],
-            'celery': ['celery'],
-            'lupin': ['lupin', 'lupine']
-        }
-        
-        # Get user allergen terms (expand to include variants)
-        user_allergen_terms = set()
-        for allergen_obj in user_allergens:
-            user_allergen = allergen_obj['allergen'].lower().strip()
-            user_allergen_terms.add(user_allergen)
-            
-            # Add mapped variants
-            for main_allergen, variants in allergen_mappings.items():
-                if user_allergen in variants or any(variant in user_allergen for variant in variants):
-                    user_allergen_terms.update(variants)
-        
-        items_with_allergens = []
-        
-        for item in pantry_items:
-            item_allergens = item.get('allergens', '')
-            if pd.isna(item_allergens) or not item_allergens:
-                continue
-                
-            item_allergens_str = str(item_allergens).lower().strip()
-            
-            # Check if any user allergen matches this item's allergens
-            if any(allergen_term in item_allergens_str for allergen_term in user_allergen_terms):
-                item_copy = item.copy()
-                item_copy['matched_allergens'] = item_allergens
-                items_with_allergens.append(item_copy)
-        
-        # Clean NaN values from items before JSON serialization
-        cleaned_items = []
-        for item in items_with_allergens:
-            cleaned_item = {}
-            for key, value in item.items():
-                # Replace NaN, None, and 'nan' string values with appropriate defaults
-                if pd.isna(value) or value is None or str(value).lower() == 'nan':
-                    if key in ['price', 'quantity', 'restock_days']:
-                        cleaned_item[key] = 0
-                    elif key in ['barcode']:
-                        cleaned_item[key] = None
-                    else:
-                        cleaned_item[key] = ''
-                else:
-                    cleaned_item[key] = value
-            cleaned_items.append(cleaned_item)
-        
-        return jsonify({'items': cleaned_items})
+        return jsonify({'items': items_with_allergens})
     except Exception as e:
         logging.error(f"Error getting allergen items: {e}")
         return jsonify({'items': []})
@@ -381,19 +330,29 @@ def get_allergen_items():
 @app.route('/pantry/search')
 def search_pantry():
     """Search pantry items"""
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit <= 0 or offset < 0:
+        return jsonify({'items': [], 'total': 0, 'offset': offset, 'limit': limit,
+                        'error': 'limit must be a positive number and offset zero or more'}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
     try:
-        query = request.args.get('q', '').lower()
-        pantry_items = pantry_manager.get_pantry_items()
-        
-        filtered_items = [
-            item for item in pantry_items 
-            if query in item.get('product_name', '').lower()
-        ]
+        items, total = pantry_manager.search_pantry_items(query, limit, offset)
         
-        return jsonify({'items': filtered_items})
+        return jsonify({'items': items, 'total': total, 'offset': offset, 'limit': limit})
     except Exception as e:
         logging.error(f"Error searching pantry: {e}")
-        return jsonify({'items': []})
+        return jsonify({'items': [], 'total': 0, 'offset': offset, 'limit': limit})
+
+@app.route('/pantry/nutrition_totals')
+def pantry_nutrition_totals():
+    """Get nutrient totals across the whole pantry, weighted by quantity"""
+    try:
+        return jsonify({'totals': pantry_manager.get_nutrition_totals()})
+    except Exception as e:
+        logging.error(f"Error getting nutrition totals: {e}")
+        return jsonify({'totals': []})
 
 @app.route('/pantry/extend_warranty', methods=['POST'])
 def extend_warranty():
@@ -415,26 +374,17 @@ def extend_warranty():
 def get_all_pantry_items():
     """Get all pantry items for the sidebar view"""
     try:
-        items = pantry_manager.get_pantry_items()
-        
-        # Clean NaN values from items before JSON serialization
-        cleaned_items = []
-        for item in items:
-            cleaned_item = {}
-            for key, value in item.items():
-                # Replace NaN, None, and 'nan' string values with appropriate defaults
-                if pd.isna(value) or value is None or str(value).lower() == 'nan':
-                    if key in ['price', 'quantity', 'restock_days']:
-                        cleaned_item[key] = 0
-                    elif key in ['barcode']:
-                        cleaned_item[key] = None
-                    else:
-                        cleaned_item[key] = ''
-                else:
-                    cleaned_item[key] = value
-            cleaned_items.append(cleaned_item)
-        
-        return jsonify({'items': cleaned_items})
+        fields = request.args.get('fields')
+        fields = fields.split(',') if fields else None
+        limit = request.args.get('limit', type=int)
+        if limit is None:
+            return jsonify({'items': pantry_manager.get_pantry_items(fields), 'next_cursor': None})
+        if limit <= 0:
+            return jsonify({'items': [], 'next_cursor': None, 'error': 'limit must be a positive number'}), 400
+        limit = min(limit, MAX_PAGE_SIZE)
+        
+        items, next_cursor = pantry_manager.get_pantry_page(limit, request.args.get('cursor'), fields)
+        return jsonify({'items': items, 'next_cursor': next_cursor})
     except Exception as e:
         logging.error(f"Error getting all pantry items: {e}")
         return jsonify({'items': []})
@@ -472,11 +422,7 @@ def get_order_items():
         if not order_id:
             return jsonify({'items': []})
         
-        # Get all orders
-        orders = data_manager.get_orders()
-        
-        # Find the specific order
-        order = next((o for o in orders if str(o.get('order_id')) == str(order_id)), None)
+        order = data_manager.get_order(order_id)
         
         if not order:
             return jsonify({'items': []})
@@ -490,14 +436,7 @@ def get_order_items():
             product_name = item.get('product_name', '')
             
             # Determine storage tag based on product name/category
-            if any(keyword in product_name.lower() for keyword in ['milk', 'dairy', 'cheese', 'yogurt', 'vegetable', 'carrot', 'lettuce']):
-                item_storage = 'Refrigerator'
-            elif any(keyword in product_name.lower() for keyword in ['meat', 'chicken', 'beef', 'frozen']):
-                item_storage = 'Freezer'
-            elif any(keyword in product_name.lower() for keyword in ['fruit', 'apple', 'banana', 'bread']):
-                item_storage = 'Counter'
-            else:
-                item_storage = 'Pantry'
+            item_storage = categorizer.categorize(product_name).storage_tag
             
             # Create item with storage info
             storage_item = {
@@ -529,5 +468,15 @@ def get_nutrition_highlights():
         logging.error(f"Error getting nutrition highlights: {e}")
         return jsonify({'highlights': []})
 
+@app.route('/metrics')
+def metrics():
+    """Expose request, stage and method latency histograms in the Prometheus text format"""
+    return app.response_class(instrumentation.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Get hit/miss counters for the shared table cache"""
+    return jsonify(table_cache.stats())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
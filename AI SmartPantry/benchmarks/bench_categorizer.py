@@ -0,0 +1,74 @@
+"""Micro-benchmark the product categorizer against the keyword chains it replaced
+
+Usage: python benchmarks/bench_categorizer.py
+"""
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts the application modules on sys.path)
+from categorizer import ProductCategorizer
+
+WORDS = ['Organic', 'Whole', 'Milk', 'Bread', 'Chicken', 'Breast', 'Fresh', 'Apples', 'Bananas', 'Carrots',
+         'Laptop', 'Smart', 'TV', 'Frozen', 'Peas', 'Greek', 'Yogurt', 'Rice', 'Pasta', 'Beef', 'Lettuce']
+LOOKUPS = 200_000
+
+
+def legacy_categorize(product_name):
+    """The category chain from add_order_items_to_pantry before the categorizer"""
+    if any(keyword in product_name.lower() for keyword in ['milk', 'dairy', 'cheese', 'yogurt']):
+        return 'Dairy', 7
+    elif any(keyword in product_name.lower() for keyword in ['bread', 'bakery']):
+        return 'Bakery', 5
+    elif any(keyword in product_name.lower() for keyword in ['meat', 'chicken', 'beef']):
+        return 'Meat', 3
+    elif any(keyword in product_name.lower() for keyword in ['fruit', 'apple', 'banana']):
+        return 'Fruit', 7
+    elif any(keyword in product_name.lower() for keyword in ['vegetable', 'carrot', 'lettuce']):
+        return 'Vegetable', 5
+    return 'Grocery', 30
+
+
+def legacy_storage_tag(product_name):
+    """The storage chain from /pantry/order_items before the categorizer"""
+    if any(keyword in product_name.lower() for keyword in ['milk', 'dairy', 'cheese', 'yogurt', 'vegetable', 'carrot', 'lettuce']):
+        return 'Refrigerator'
+    elif any(keyword in product_name.lower() for keyword in ['meat', 'chicken', 'beef', 'frozen']):
+        return 'Freezer'
+    elif any(keyword in product_name.lower() for keyword in ['fruit', 'apple', 'banana', 'bread']):
+        return 'Counter'
+    return 'Pantry'
+
+
+def timed(label, func, names):
+    """Run func over every name and report the cost per lookup"""
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:>9.1f} ms {elapsed / len(names) * 1e9:>8.0f} ns/lookup")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    distinct = [' '.join(rng.choice(WORDS, 3)) for _ in range(500)]
+    names = [distinct[i] for i in rng.integers(0, len(distinct), LOOKUPS)]
+
+    # The categorizer must agree with the category chain on everything it used to classify
+    categorizer = ProductCategorizer()
+    for name in distinct:
+        result = categorizer.categorize(name)
+        if result.category != 'Frozen':
+            assert (result.category, result.expiry_days) == legacy_categorize(name), name
+
+    print(f"{LOOKUPS} lookups over {len(distinct)} distinct product names")
+    timed('legacy category + storage chains', lambda n: (legacy_categorize(n), legacy_storage_tag(n)), names)
+    uncached = ProductCategorizer(cache_size=0)
+    timed('compiled regex, no cache', uncached.categorize, names)
+    cached = ProductCategorizer()
+    timed('compiled regex, LRU cached', cached.categorize, names)
+    print(cached.cache_info())
+
+
+if __name__ == '__main__':
+    main()
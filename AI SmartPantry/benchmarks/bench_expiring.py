@@ -0,0 +1,90 @@
+"""Benchmark expiring-item lookups from 10 to 100k pantry rows
+
+Usage: python benchmarks/bench_expiring.py
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_pantry_frame
+from pantry_manager import PantryManager
+from storage import SQLiteStorage
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+
+def scan_expiring(df, days, today):
+    """Whole-column scan the expiry index replaced, kept for comparison"""
+    expiry_dates = pd.to_datetime(df['expiry_date'])
+    expiring_dates = expiry_dates[expiry_dates <= today + timedelta(days=days)]
+    days_remaining = (expiring_dates - today).dt.days.sort_values(kind='stable')
+    conditions = [days_remaining <= 0, days_remaining <= 1, days_remaining <= 2]
+    return df.loc[days_remaining.index].assign(
+        days_remaining=days_remaining,
+        progress_percentage=(days_remaining / days * 100).clip(0, 100),
+        urgency=np.select(conditions, ['expired', 'critical', 'urgent'], default='normal')
+    ).to_dict('records')
+
+
+def legacy_expiring(df, days, today):
+    """Row-by-row implementation the vectorized version replaced, kept for comparison"""
+    df = df.assign(expiry_date=df['expiry_date'].pipe(__import__('pandas').to_datetime))
+    expiring = df[df['expiry_date'] <= today + timedelta(days=days)]
+    items = []
+    for _, item in expiring.iterrows():
+        item_dict = item.to_dict()
+        days_remaining = (item['expiry_date'] - today).days
+        if days_remaining <= 0:
+            urgency = 'expired'
+        elif days_remaining <= 1:
+            urgency = 'critical'
+        elif days_remaining <= 2:
+            urgency = 'urgent'
+        else:
+            urgency = 'normal'
+        item_dict.update({
+            'days_remaining': days_remaining,
+            'progress_percentage': max(0, min(100, (days_remaining / days) * 100)),
+            'urgency': urgency
+        })
+        items.append(item_dict)
+    items.sort(key=lambda x: x['days_remaining'])
+    return items
+
+
+def best_of(func, repeat):
+    """Best wall-clock time of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    today = datetime.now()
+    print(f"{'rows':>8} {'expiring':>9} {'index ms':>9} {'cached ms':>10} {'scan ms':>8} {'iterrows ms':>12}")
+    for rows in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SQLiteStorage(os.path.join(directory, 'bench.db'), directory)
+            df = make_pantry_frame(rows, today=today)
+            storage.write_table('pantry_items', df)
+            manager = PantryManager(storage)
+            manager.pantry_mirror.sync()
+            repeat = 5 if rows <= 10_000 else 2
+            expiring = len(manager.get_expiring_items(7, today))
+            indexed = best_of(lambda: manager.get_expiring_items(7, today), repeat)
+            manager.get_expiring_items(7)
+            cached = best_of(lambda: manager.get_expiring_items(7), repeat)
+            scan = best_of(lambda: scan_expiring(df, 7, today), repeat)
+            legacy = best_of(lambda: legacy_expiring(df, 7, today), repeat if rows <= 10_000 else 1)
+            print(f"{rows:>8} {expiring:>9} {indexed:>9.2f} {cached:>10.3f} {scan:>8.2f} {legacy:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Time bulk pantry imports and show that their peak memory doesn't grow with the file
+
+Usage: python benchmarks/bench_import.py [rows,rows,...] [excel|sqlite]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import make_pantry_frame
+from pantry_manager import PantryManager
+from storage import ExcelStorage, SQLiteStorage
+
+
+def write_csv(path, rows):
+    """Write a pantry CSV of synthetic items, the way a household or store export might look"""
+    frame = make_pantry_frame(rows)
+    columns = ['product_name', 'quantity', 'price', 'expiry_date', 'allergens', 'nutrition_a']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(frame[columns].itertuples(index=False))
+
+
+def main():
+    sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else '5000,20000').split(',')]
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'sqlite'
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            if backend == 'sqlite':
+                storage = SQLiteStorage(os.path.join(directory, 'bench.db'), directory)
+            else:
+                storage = ExcelStorage(directory)
+            manager = PantryManager(storage)
+            path = os.path.join(directory, 'items.csv')
+            write_csv(path, rows)
+            tracemalloc.start()
+            start = time.perf_counter()
+            with open(path, 'rb') as f:
+                report = manager.import_pantry_file(f, 'csv')
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{backend} {rows:>7} rows: imported {report['imported']}, rejected {report['rejected']}, "
+                  f"{elapsed:.2f} s, peak {peak / 2**20:.1f} MiB, file {os.path.getsize(path) / 2**20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Measure the memory held by pantry rows as row dicts versus the compact pantry store
+
+Usage: python benchmarks/bench_memory.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import make_pantry_frame
+from storage import SQLiteStorage
+from pantry_manager import PantryManager
+
+
+def allocated(build):
+    """Run build and return its result with the bytes it left allocated"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, 'bench.db'), directory)
+        storage.write_table('pantry_items', make_pantry_frame(rows))
+        manager = PantryManager(storage)
+
+        df = storage.read_table('pantry_items')
+        records, records_bytes = allocated(lambda: df.to_dict('records'))
+        del records
+        start = time.perf_counter()
+        manager.pantry_mirror.sync()
+        sync_ms = (time.perf_counter() - start) * 1000
+        frame = manager.pantry_mirror.frame
+
+        mib = 1024 * 1024
+        print(f"{rows} pantry rows")
+        print(f"  frame as read           {df.memory_usage(deep=True).sum() / mib:>8.1f} MiB")
+        print(f"  to_dict('records')      {records_bytes / mib:>8.1f} MiB")
+        print(f"  compact pantry store    {frame.memory_usage(deep=True).sum() / mib:>8.1f} MiB "
+              f"(built with its indexes in {sync_ms:.0f} ms)")
+
+        start = time.perf_counter()
+        page = manager.pantry_mirror.materialize(frame.iloc[:50], ['product_name', 'expiry_date'])
+        print(f"  materialize 50 rows, 2 fields {(time.perf_counter() - start) * 1e6:>8.0f} us")
+        assert len(page) == 50
+
+
+if __name__ == '__main__':
+    main()
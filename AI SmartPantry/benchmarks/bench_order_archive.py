@@ -0,0 +1,56 @@
+"""Measure the memory-mapped order archive against holding the order history as a frame
+
+Usage: python benchmarks/bench_order_archive.py [lines]
+"""
+import sys
+import tempfile
+import time
+
+from synthetic import make_orders_frame
+from order_archive import OrderArchive
+from storage import ExcelStorage
+from table_cache import table_cache
+
+
+def timed(label, func, repeat=1):
+    """Run func repeat times and report the mean time per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"  {label:<38} {(time.perf_counter() - start) * 1000 / repeat:>9.3f} ms")
+    return result
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        storage = ExcelStorage(directory)
+        storage.write_table('orders', make_orders_frame(lines))
+        frame = storage.read_table('orders')
+        print(f"{lines} order lines")
+        print(f"  {'frame held per worker':<38} {frame.memory_usage(deep=True).sum() / 2**20:>7.1f} MiB")
+
+        archive = OrderArchive(storage, 'orders')
+        timed('first sync (builds the files)', archive.sync)
+        print(f"  {'archive mapped, shared by workers':<38} {archive.stats()['mapped_bytes'] / 2**20:>7.1f} MiB")
+
+        # A second worker only maps the files the first one wrote
+        table_cache.clear()
+        other = OrderArchive(storage, 'orders')
+        timed('sync in another worker (maps only)', other.sync)
+        timed('sync when unchanged', other.sync, repeat=1000)
+
+        order_ids = other.index['order_id']
+        timed('get_order by id', lambda: other.get_order(int(order_ids[len(order_ids) // 2])), repeat=1000)
+        timed('get_orders(limit=20)', lambda: other.get_orders(20), repeat=100)
+        timed('get_page(20, cursor)', lambda: other.get_page(20, int(order_ids[len(order_ids) // 3])), repeat=100)
+
+        next_id = int(order_ids[-1]) + 1
+        rows = [{'order_id': next_id, 'product_name': 'Oats', 'quantity': 1, 'price': 2.5, 'total': 2.5,
+                 'order_date': '2030-01-01 00:00:00'}]
+        timed('append one order through storage', lambda: storage.append_rows('orders', rows))
+        timed('sync after the append (remap)', other.sync)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Time restock forecasting over a long order history
+
+Usage: python benchmarks/bench_restock.py [lines]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from synthetic import make_orders_frame, make_pantry_frame
+from restock_forecast import PurchaseHistory, forecast_restock
+
+
+class _Mirror:
+    """Just enough of a TableMirror to host the purchase history"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.lock = __import__('threading').RLock()
+
+    def add_index(self, index):
+        index.add(self.frame)
+
+    def sync(self):
+        return self.frame
+
+
+def timed(label, func):
+    """Run func once and report how long it took"""
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<34} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    orders = make_orders_frame(lines)
+    pantry = make_pantry_frame(2_000)
+    print(f"{lines} order lines, {orders['order_id'].nunique()} orders")
+
+    history = timed('build purchase history', lambda: PurchaseHistory(_Mirror(orders)))
+    new_order = pd.DataFrame([{
+        'order_id': orders['order_id'].max() + 1, 'product_name': 'Organic Milk', 'quantity': 2,
+        'price': 3.49, 'total': 6.98, 'order_date': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    }])
+    timed('fold in one new order', lambda: history.add(new_order))
+    purchases = timed('snapshot', history.snapshot)
+    suggestions = timed('forecast against the pantry', lambda: forecast_restock(purchases, pantry))
+    for suggestion in suggestions:
+        print(f"    {suggestion['product_name']:<18} {suggestion['urgency']:<9} {suggestion['suggestion']}")
+
+
+if __name__ == '__main__':
+    main()
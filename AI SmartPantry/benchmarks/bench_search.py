@@ -0,0 +1,57 @@
+"""Micro-benchmark pantry search lookups against the linear scan they replaced
+
+Usage: python benchmarks/bench_search.py [rows]
+"""
+import sys
+import time
+
+from synthetic import make_pantry_frame
+from search_index import SearchIndex
+
+QUERIES = ['m', 'mi', 'milk', 'ilk', 'organic milk', 'chick', 'dairy', 'fridge', 'apples 42']
+REPEATS = 200
+
+
+def legacy_search(items, query):
+    """The product-name scan from /pantry/search before the index"""
+    query = query.lower()
+    return [item for item in items if query in item.get('product_name', '').lower()]
+
+
+def timed(label, func, repeats):
+    """Run func repeatedly and report the mean cost per call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"  {label:<26} {elapsed * 1e6:>10.1f} us")
+    return result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_pantry_frame(rows)
+    # Number the products so the vocabulary grows with the table like real data
+    df['product_name'] = df['product_name'] + ' ' + (df.index % 5000).astype(str)
+    items = df.to_dict('records')
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.add(df)
+    print(f"indexed {rows} rows in {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"{len(index.postings)} tokens")
+
+    for query in QUERIES:
+        labels, total = index.search(query, limit=50)
+        print(f"q={query!r}: {total} matches")
+        timed('legacy linear scan', lambda: legacy_search(items, query), 3)
+        timed('index, top 50, cold', lambda: (index.results.clear(), index.search(query, limit=50)), REPEATS)
+        timed('index, page 2, cached', lambda: index.search(query, limit=50, offset=50), REPEATS)
+
+    # Incremental maintenance cost for a single add and remove
+    row = df.iloc[[0]].set_axis([rows])
+    timed('add one row', lambda: (index.add(row), index.remove(row)), REPEATS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Compare cold and warm workbook reads with and without the binary snapshot sidecar
+
+Usage: python benchmarks/bench_snapshot.py [rows]
+
+Before timing, it checks that the snapshot of each edge-case frame equals a
+parse of the workbook, since a mismatch would make reads change after a restart.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from synthetic import make_pantry_frame
+from storage import ExcelStorage, as_read_back
+from table_cache import table_cache
+
+
+def timed(label, func):
+    """Run func once and report how long it took"""
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<38} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+# Frames whose read-back is easy to get wrong: whole floats, text that parses
+# as bools, and trailing rows with only missing values or empty strings
+EDGE_CASES = [
+    pd.DataFrame({'can': [True, False, None], 'x': ['True', 'false', '']}),
+    pd.DataFrame({'a': [1, None, None], 'b': ['x', None, '']}),
+    pd.DataFrame({'a': [None, None], 'b': ['', '']}),
+    pd.DataFrame({'a': [1, None, 2], 'b': ['', '', 'x']}),
+    pd.DataFrame({'price': [2.0, 3.5], 'stock': [2.0, 3.0], 'date': pd.to_datetime(['2024-01-01', '2024-01-02'])})
+]
+
+
+def check_equivalence(directory, frames):
+    """Check that the snapshot of each frame equals what read_excel parses from its workbook"""
+    path = os.path.join(directory, 'check.xlsx')
+    for df in frames:
+        df.to_excel(path, index=False)
+        pd.testing.assert_frame_equal(as_read_back(df), pd.read_excel(path, engine='openpyxl'))
+    print(f"snapshots match workbook reads for {len(frames)} frames")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        check_equivalence(directory, EDGE_CASES + [make_pantry_frame(1000)])
+        storage = ExcelStorage(directory)
+        path = storage.path_for('pantry_items')
+        print(f"{rows} pantry rows")
+        timed('write workbook and snapshot', lambda: storage.write_table('pantry_items', make_pantry_frame(rows)))
+        print(f"  {'workbook / snapshot size':<38} {os.path.getsize(path) / 2**20:>7.1f} / "
+              f"{os.path.getsize(storage.snapshot_path(path)) / 2**20:.1f} MiB")
+
+        table_cache.clear()
+        timed('cold read from snapshot', lambda: storage.read_table('pantry_items'))
+        timed('warm read (table cache)', lambda: storage.read_table('pantry_items'))
+
+        os.remove(storage.snapshot_path(path))
+        table_cache.clear()
+        timed('cold read parsing the workbook', lambda: storage.read_table('pantry_items'))
+        timed('warm read (table cache)', lambda: storage.read_table('pantry_items'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""Time every DataManager/PantryManager method and every Flask route against synthetic tables
+
+Each table size gets a fresh storage directory holding size pantry rows,
+size order lines and size / 100 allergens. Every case is warmed up once
+and then timed at each concurrency level, with every worker thread making
+repeat calls. Results are written as JSON so runs from different commits
+can be compared.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000,10000,100000] [--backend sqlite|excel]
+                                        [--concurrency 1,4,8] [--repeat 20] [--output results.json]
+                                        [--compare baseline.json]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from synthetic import make_allergens_frame, make_orders_frame, make_pantry_frame, make_products_frame
+from storage import ExcelStorage, SQLiteStorage
+
+SIZES = [1_000, 10_000, 100_000]
+CONCURRENCY = [1, 4, 8]
+REPEAT = 20
+
+# A small pantry CSV posted to the bulk import route
+IMPORT_CSV = b'product_name,quantity,expiry_date,allergens\nBench Import Item,2,2030-01-01,milk\n'
+
+# A case whose p50 grows by more than this factor over the baseline is reported as a regression
+REGRESSION_FACTOR = 1.2
+
+
+def build_storage(backend, directory, size):
+    """Create a storage backend in directory holding synthetic tables of the given size"""
+    if backend == 'sqlite':
+        storage = SQLiteStorage(os.path.join(directory, 'bench.db'), directory)
+    else:
+        storage = ExcelStorage(directory)
+    storage.write_table('products', make_products_frame())
+    storage.write_table('pantry_items', make_pantry_frame(size))
+    storage.write_table('orders', make_orders_frame(size))
+    storage.write_table('user_allergens', make_allergens_frame(max(size // 100, 1)))
+    return storage
+
+
+def method_cases(data_manager, pantry_manager):
+    """Name each manager method with a call that exercises it"""
+    order_id = data_manager.get_orders(limit=1)[0]['order_id']
+    purchases = data_manager.get_purchase_history()
+    return {
+        'DataManager.get_products': lambda: data_manager.get_products(),
+        'DataManager.get_product': lambda: data_manager.get_product(3),
+        'DataManager.get_orders': lambda: data_manager.get_orders(limit=20),
+        'DataManager.get_order_page': lambda: data_manager.get_order_page(20),
+        'DataManager.get_order': lambda: data_manager.get_order(order_id),
+        'DataManager.get_purchase_history': data_manager.get_purchase_history,
+        'DataManager.count_orders': data_manager.count_orders,
+        'DataManager.create_order': lambda: data_manager.create_order({'1': {'name': 'Organic Milk', 'price': 3.49, 'quantity': 1}}),
+        'PantryManager.get_pantry_items': lambda: pantry_manager.get_pantry_items(['product_name', 'expiry_date']),
+        'PantryManager.get_pantry_page': lambda: pantry_manager.get_pantry_page(50),
+        'PantryManager.search_pantry_items': lambda: pantry_manager.search_pantry_items('milk', 50),
+        'PantryManager.get_items_by_storage_tag': lambda: pantry_manager.get_items_by_storage_tag('Freezer'),
+        'PantryManager.get_expiring_items': lambda: pantry_manager.get_expiring_items(7),
+        'PantryManager.get_quick_use_items': pantry_manager.get_quick_use_items,
+        'PantryManager.get_user_allergens': pantry_manager.get_user_allergens,
+        'PantryManager.get_allergen_items': pantry_manager.get_allergen_items,
+        'PantryManager.get_warranty_items': pantry_manager.get_warranty_items,
+        'PantryManager.generate_restock_suggestions': lambda: pantry_manager.generate_restock_suggestions(purchases),
+        'PantryManager.get_nutrition_highlights': pantry_manager.get_nutrition_highlights,
+        'PantryManager.get_nutrition_totals': pantry_manager.get_nutrition_totals,
+        'PantryManager.build_dashboard': lambda: pantry_manager.build_dashboard(
+            lambda: data_manager.get_orders(limit=20), data_manager.get_purchase_history
+        ),
+        'PantryManager.add_pantry_item+remove_pantry_item': lambda: (
+            pantry_manager.add_pantry_item({'product_name': 'Bench Item', 'expiry_date': '2030-01-01'}),
+            pantry_manager.remove_pantry_item('Bench Item')
+        ),
+        'PantryManager.add_allergen+remove_allergen': lambda: (
+            pantry_manager.add_allergen('bench allergen'),
+            pantry_manager.remove_allergen('bench allergen')
+        ),
+        'PantryManager.add_order_items_to_pantry': lambda: pantry_manager.add_order_items_to_pantry(
+            [{'product_name': 'Bench Order Item', 'quantity': 1, 'price': 1.0}]
+        )
+    }
+
+
+def import_payload():
+    """Build a fresh multipart upload of a small pantry CSV, since a sent file stream is used up"""
+    return {'data': {'file': (io.BytesIO(IMPORT_CSV), 'bench.csv')}, 'content_type': 'multipart/form-data'}
+
+
+def route_cases(order_id):
+    """Name each route with a (method, url, payload) request, or a list of them sent in turn
+
+    A payload may be a function returning the request arguments, for bodies
+    that can only be sent once.
+    """
+    return {
+        'GET /': ('get', '/', None),
+        'POST /add_to_cart': ('post', '/add_to_cart', {'data': {'product_id': 1, 'quantity': 1}}),
+        'GET /cart': ('get', '/cart', None),
+        'POST /update_cart': ('post', '/update_cart', {'data': {'product_id': '1', 'quantity': 2}}),
+        'POST /remove_from_cart': ('post', '/remove_from_cart', {'data': {'product_id': '1'}}),
+        'POST /checkout': [('post', '/add_to_cart', {'data': {'product_id': 2, 'quantity': 1}}),
+                           ('post', '/checkout', None)],
+        'GET /orders': ('get', '/orders', None),
+        'GET /orders/page': ('get', '/orders/page', None),
+        'GET /get_cart_count': ('get', '/get_cart_count', None),
+        'GET /pantry': ('get', '/pantry', None),
+        'POST /pantry/add_item': [('post', '/pantry/add_item', {'json': {'product_name': 'Bench Route Item', 'expiry_date': '2030-01-01'}}),
+                                  ('post', '/pantry/remove_item', {'json': {'product_name': 'Bench Route Item'}})],
+        'POST /pantry/import': [('post', '/pantry/import', import_payload),
+                                ('post', '/pantry/remove_item', {'json': {'product_name': 'Bench Import Item'}})],
+        'GET /pantry/filter_by_tag': ('get', '/pantry/filter_by_tag?tag=Freezer', None),
+        'POST /pantry/add_allergen': [('post', '/pantry/add_allergen', {'json': {'allergen': 'bench route'}}),
+                                      ('post', '/pantry/remove_allergen', {'json': {'allergen': 'bench route'}})],
+        'GET /pantry/allergen_items': ('get', '/pantry/allergen_items', None),
+        'GET /pantry/search': ('get', '/pantry/search?q=milk', None),
+        'GET /pantry/nutrition_totals': ('get', '/pantry/nutrition_totals', None),
+        'POST /pantry/extend_warranty': ('post', '/pantry/extend_warranty', {'json': {'product_name': 'Laptop Computer', 'cost': 99.99}}),
+        'GET /pantry/all_items': ('get', '/pantry/all_items?limit=50', None),
+        'GET /pantry/order_items': ('get', f'/pantry/order_items?order_id={order_id}', None),
+        'GET /nutrition_highlights': ('get', '/nutrition_highlights', None),
+        'GET /metrics': ('get', '/metrics', None),
+        'GET /cache/stats': ('get', '/cache/stats', None)
+    }
+
+
+def uncovered_routes(app, cases):
+    """List the app's routes that no case requests"""
+    requested = {url.split('?')[0] for case in cases.values() for _, url, _ in (case if isinstance(case, list) else [case])}
+    return sorted(rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != 'static' and rule.rule not in requested)
+
+
+def route_call(client, case):
+    """Build a call that sends a route case's requests through a test client"""
+    requests = case if isinstance(case, list) else [case]
+
+    def call():
+        for method, url, payload in requests:
+            if callable(payload):
+                payload = payload()
+            response = getattr(client, method)(url, **(payload or {}))
+            if response.status_code >= 500:
+                raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+    return call
+
+
+def measure(make_call, concurrency, repeat):
+    """Time repeat calls on each of concurrency threads, each thread using its own call from make_call"""
+    calls = [make_call() for _ in range(concurrency)]
+    calls[0]()
+
+    def worker(call):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = np.concatenate(list(pool.map(worker, calls)))
+    elapsed = time.perf_counter() - start
+    return {
+        'calls': len(timings),
+        'mean_ms': round(float(timings.mean()), 3),
+        'p50_ms': round(float(np.percentile(timings, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings, 95)), 3),
+        'max_ms': round(float(timings.max()), 3),
+        'throughput_per_s': round(len(timings) / elapsed, 1)
+    }
+
+
+def git_commit():
+    """Get the commit being benchmarked, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(app_module, backend, size, concurrency_levels, repeat, only):
+    """Benchmark every case against tables of one size"""
+    from data_manager import DataManager
+    from pantry_manager import PantryManager
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        storage = build_storage(backend, directory, size)
+        data_manager = DataManager(storage)
+        pantry_manager = PantryManager(storage)
+        # Routes look the managers up as module globals, so point them at this size's tables
+        app_module.data_manager = data_manager
+        app_module.pantry_manager = pantry_manager
+        setup_s = time.perf_counter() - start
+        print(f"{size} rows ({backend}): tables built in {setup_s:.1f} s", file=sys.stderr)
+
+        order_id = data_manager.get_orders(limit=1)[0]['order_id']
+        cases = [('method', name, lambda call=call: call) for name, call in method_cases(data_manager, pantry_manager).items()]
+        cases += [('route', name, lambda case=case: route_call(app_module.app.test_client(), case))
+                  for name, case in route_cases(order_id).items()]
+        for kind, name, make_call in cases:
+            if only and only not in name:
+                continue
+            for concurrency in concurrency_levels:
+                result = {'size': size, 'kind': kind, 'name': name, 'concurrency': concurrency}
+                try:
+                    result.update(measure(make_call, concurrency, repeat))
+                except Exception as e:
+                    result['error'] = str(e)
+                results.append(result)
+                print(f"  {name:<52} x{concurrency:<3} {result.get('p50_ms', float('nan')):>10.3f} ms p50",
+                      file=sys.stderr)
+    return results
+
+
+def compare(report, baseline):
+    """Print each case's p50 against a baseline report, flagging regressions"""
+    def key(result):
+        return result['size'], result['kind'], result['name'], result['concurrency']
+
+    before = {key(result): result for result in baseline['results'] if 'p50_ms' in result}
+    print(f"compared with {baseline.get('commit')}", file=sys.stderr)
+    for result in report['results']:
+        old = before.get(key(result))
+        if old is None or 'p50_ms' not in result or not old['p50_ms']:
+            continue
+        ratio = result['p50_ms'] / old['p50_ms']
+        flag = '  REGRESSION' if ratio > REGRESSION_FACTOR else ''
+        print(f"  {result['size']:>7} {result['name']:<52} x{result['concurrency']:<3} "
+              f"{old['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms ({ratio:.2f}x){flag}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--backend', choices=['sqlite', 'excel'], default='sqlite')
+    parser.add_argument('--concurrency', default=','.join(map(str, CONCURRENCY)))
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--only', help='only run cases whose name contains this text')
+    parser.add_argument('--output', help='write the JSON here instead of stdout')
+    parser.add_argument('--compare', help='a previous JSON report to compare p50 timings against')
+    args = parser.parse_args()
+
+    # Importing the app creates its default managers, so do it somewhere disposable
+    home = os.getcwd()
+    scratch = tempfile.mkdtemp()
+    os.chdir(scratch)
+    import app as app_module
+    logging.getLogger().setLevel(logging.WARNING)
+    os.chdir(home)
+    if app_module.pantry_manager.expiry_sweeper is not None:
+        app_module.pantry_manager.expiry_sweeper.stop()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'repeat': args.repeat,
+        'uncovered_routes': uncovered_routes(app_module.app, route_cases(0)),
+        'results': []
+    }
+    for size in (int(size) for size in args.sizes.split(',')):
+        report['results'] += run_size(app_module, args.backend, size,
+                                      [int(level) for level in args.concurrency.split(',')], args.repeat, args.only)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(report, json.load(baseline))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Synthetic data generators shared by the benchmark scripts"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Make the application modules importable when run as `python benchmarks/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRODUCT_NAMES = ['Organic Milk', 'Whole Wheat Bread', 'Cheddar Cheese', 'Fresh Apples', 'Chicken Breast',
+                 'Greek Yogurt', 'Bananas', 'Carrots', 'Lettuce', 'Ground Beef', 'Rice', 'Pasta']
+CATEGORIES = ['Dairy', 'Bakery', 'Dairy', 'Fruit', 'Meat', 'Dairy', 'Fruit', 'Vegetable', 'Vegetable',
+              'Meat', 'Grocery', 'Grocery']
+STORAGE_TAGS = ['Refrigerator', 'Pantry', 'Refrigerator', 'Counter', 'Freezer', 'Refrigerator', 'Counter',
+                'Refrigerator', 'Refrigerator', 'Freezer', 'Pantry', 'Pantry']
+NUTRITION = ['Calcium: 300mg', 'Fiber: 3g', 'Protein: 7g', 'Vitamin C: 14%', 'Protein: 25g', 'Iron: 6%', '']
+ALLERGENS = ['Lactose', 'Gluten', '', '', 'Eggs', 'Soy', 'Peanuts']
+
+
+def make_pantry_frame(rows, seed=0, today=None):
+    """Build a pantry_items frame with the same columns as the real workbook"""
+    rng = np.random.default_rng(seed)
+    today = today or datetime.now()
+    product = rng.integers(0, len(PRODUCT_NAMES), rows)
+    expiry_offsets = rng.integers(-5, 30, rows)
+    return pd.DataFrame({
+        'barcode': rng.integers(10**9, 10**10, rows).astype(str),
+        'product_name': np.array(PRODUCT_NAMES)[product],
+        'photo': '',
+        'price': rng.uniform(0.5, 20, rows).round(2),
+        'category': np.array(CATEGORIES)[product],
+        'storage_tags': np.array(STORAGE_TAGS)[product],
+        'expiry_date': [(today + timedelta(days=int(d))).strftime('%Y-%m-%d') for d in expiry_offsets],
+        'quantity': rng.integers(1, 6, rows),
+        'unit': 'pcs',
+        'date_added': today.strftime('%Y-%m-%d'),
+        'description': 'Synthetic pantry item',
+        'nutrition_a': np.array(NUTRITION)[rng.integers(0, len(NUTRITION), rows)],
+        'nutrition_b': np.array(NUTRITION)[rng.integers(0, len(NUTRITION), rows)],
+        'nutrition_c': np.array(NUTRITION)[rng.integers(0, len(NUTRITION), rows)],
+        'allergens': np.array(ALLERGENS)[rng.integers(0, len(ALLERGENS), rows)],
+        'disposal_methods': 'Compost',
+        'donate_option': 'Food bank',
+        'warranty': '',
+        'restock_description': 'Synthetic restock note',
+        'restock_days': rng.integers(3, 15, rows)
+    })
+
+
+def make_orders_frame(lines, seed=0, today=None, days=730):
+    """Build an orders frame of order lines spread over the last `days` days, oldest first"""
+    rng = np.random.default_rng(seed)
+    today = today or datetime.now()
+    orders = max(lines // 3, 1)
+    order_of_line = np.sort(rng.integers(0, orders, lines))
+    order_offsets = np.sort(rng.uniform(0, days, orders))[::-1]
+    order_dates = pd.to_datetime(today) - pd.to_timedelta(order_offsets, unit='D')
+    quantity = rng.integers(1, 5, lines)
+    price = rng.uniform(0.5, 20, lines).round(2)
+    return pd.DataFrame({
+        'order_id': order_of_line + 1,
+        'product_name': np.array(PRODUCT_NAMES)[rng.integers(0, len(PRODUCT_NAMES), lines)],
+        'quantity': quantity,
+        'price': price,
+        'total': (quantity * price).round(2),
+        'order_date': order_dates[order_of_line].strftime('%Y-%m-%d %H:%M:%S')
+    })
+
+
+def make_products_frame():
+    """Build a products catalog of the synthetic pantry products, with ids 1..n"""
+    return pd.DataFrame({
+        'id': np.arange(1, len(PRODUCT_NAMES) + 1),
+        'name': PRODUCT_NAMES,
+        'price': np.linspace(1.49, 12.99, len(PRODUCT_NAMES)).round(2),
+        'description': [f"Synthetic {name.lower()}" for name in PRODUCT_NAMES],
+        'stock': 1000,
+        'image': '',
+        'category': 'Grocery'
+    })
+
+
+def make_allergens_frame(rows, seed=0, today=None):
+    """Build a user_allergens frame, cycling through the known allergens and numbering the repeats"""
+    from allergen_index import ALLERGEN_MAPPINGS
+
+    rng = np.random.default_rng(seed)
+    today = today or datetime.now()
+    names = list(ALLERGEN_MAPPINGS)
+    return pd.DataFrame({
+        'allergen': [names[i % len(names)] + (f" {i // len(names)}" if i >= len(names) else '') for i in range(rows)],
+        'severity': np.array(['low', 'medium', 'high'])[rng.integers(0, 3, rows)],
+        'date_added': today.strftime('%Y-%m-%d')
+    })
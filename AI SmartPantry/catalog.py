@@ -0,0 +1,47 @@
+from table_mirror import TableMirror, frame_records
+
+
+class ProductCatalog:
+    """Id-keyed product lookups over an in-memory copy of the products table
+
+    The products are mirrored once into a columnar frame and an id-keyed dict
+    of row dicts, and reloaded only when the table's signature changes. The
+    catalog is its own index on the mirror, so products written through this
+    process's storage are picked up without a reload.
+    """
+
+    def __init__(self, storage, table='products', key='id'):
+        self.key = key
+        self.by_id = {}
+        self.mirror = TableMirror(storage, table)
+        self.mirror.add_index(self)
+
+    def clear(self):
+        """Drop every product"""
+        self.by_id = {}
+
+    def add(self, frame):
+        """Index products by id"""
+        for record in frame_records(frame):
+            self.by_id[record[self.key]] = record
+
+    def remove(self, frame):
+        """Unindex products"""
+        for product_id in frame[self.key].tolist():
+            self.by_id.pop(product_id, None)
+
+    def get_product(self, product_id):
+        """Get one product by id, or None if there is no such product"""
+        self.mirror.sync()
+        with self.mirror.lock:
+            product = self.by_id.get(product_id)
+        return dict(product) if product is not None else None
+
+    def get_products(self, ids=None):
+        """Get the products with the given ids, or every product in catalog order"""
+        self.mirror.sync()
+        with self.mirror.lock:
+            if ids is None:
+                ids = self.mirror.frame[self.key].tolist()
+            products = [self.by_id.get(product_id) for product_id in ids]
+        return [dict(product) for product in products if product is not None]
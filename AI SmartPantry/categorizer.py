@@ -0,0 +1,50 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+ProductCategory = namedtuple('ProductCategory', ['category', 'expiry_days', 'storage_tag'])
+
+# Keyword rules in priority order: the first rule with a keyword anywhere in the
+# product name wins, regardless of where in the name the keyword appears
+CATEGORY_RULES = [
+    (['milk', 'dairy', 'cheese', 'yogurt'], ProductCategory('Dairy', 7, 'Refrigerator')),
+    (['bread', 'bakery'], ProductCategory('Bakery', 5, 'Pantry')),
+    (['meat', 'chicken', 'beef'], ProductCategory('Meat', 3, 'Freezer')),
+    (['fruit', 'apple', 'banana'], ProductCategory('Fruit', 7, 'Counter')),
+    (['vegetable', 'carrot', 'lettuce'], ProductCategory('Vegetable', 5, 'Refrigerator')),
+    (['frozen'], ProductCategory('Frozen', 30, 'Freezer'))
+]
+
+# Non-perishables that match no rule
+DEFAULT_CATEGORY = ProductCategory('Grocery', 30, 'Pantry')
+
+
+class ProductCategorizer:
+    """Classifies product names into category, expiry days and storage tag in one lookup"""
+
+    def __init__(self, rules=CATEGORY_RULES, default=DEFAULT_CATEGORY, cache_size=4096):
+        self.rules = [category for _, category in rules]
+        self.default = default
+        # Anchored alternation tried rule by rule, so the first rule with a keyword
+        # anywhere in the name wins, exactly like an if/elif keyword chain
+        alternatives = '|'.join(
+            f'.*?(?P<r{i}>{"|".join(re.escape(keyword) for keyword in keywords)})'
+            for i, (keywords, _) in enumerate(rules)
+        )
+        self.pattern = re.compile(alternatives, re.DOTALL)
+        self.categorize = lru_cache(maxsize=cache_size)(self._categorize)
+
+    def _categorize(self, product_name):
+        """Find the highest-priority rule with a keyword in the product name"""
+        match = self.pattern.match(str(product_name).lower())
+        if match is None:
+            return self.default
+        return self.rules[int(match.lastgroup[1:])]
+
+    def cache_info(self):
+        """Get LRU hit/miss counters for the memoized lookups"""
+        return self.categorize.cache_info()
+
+
+# Shared by checkout and order-item storage tagging
+categorizer = ProductCategorizer()
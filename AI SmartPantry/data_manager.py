@@ -1,19 +1,28 @@
 import pandas as pd
-import os
 from datetime import datetime
 import logging
+from storage import get_storage
+from instrumentation import instrument
+from catalog import ProductCatalog
+from order_archive import OrderArchive
+from restock_forecast import PurchaseHistory
 
+@instrument('compute')
 class DataManager:
-    def __init__(self):
-        self.products_file = 'products.xlsx'
-        self.orders_file = 'orders.xlsx'
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self.products_table = 'products'
+        self.orders_table = 'orders'
         self.initialize_files()
+        self.catalog = ProductCatalog(self.storage, self.products_table)
+        self.order_archive = OrderArchive(self.storage, self.orders_table)
+        self.purchase_history = PurchaseHistory(self.order_archive)
     
     def initialize_files(self):
-        """Initialize Excel files with sample data if they don't exist"""
+        """Initialize storage tables with sample data if they don't exist"""
         try:
-            # Initialize products file
-            if not os.path.exists(self.products_file):
+            # Initialize products table
+            if not self.storage.exists(self.products_table):
                 products_data = {
                     'id': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
                     'name': ['Organic Apples', 'Fresh Bananas', 'Whole Milk', 'Bread Loaf', 'Chicken Breast', 
@@ -38,11 +47,11 @@ class DataManager:
                                 'Electronics', 'Electronics', 'Electronics', 'Electronics', 'Electronics']
                 }
                 df = pd.DataFrame(products_data)
-                df.to_excel(self.products_file, index=False, engine='openpyxl')
-                logging.info("Created products.xlsx with sample data")
+                self.storage.write_table(self.products_table, df)
+                logging.info("Created products table with sample data")
             
-            # Initialize orders file
-            if not os.path.exists(self.orders_file):
+            # Initialize orders table
+            if not self.storage.exists(self.orders_table):
                 orders_data = {
                     'order_id': [],
                     'product_name': [],
@@ -52,106 +61,117 @@ class DataManager:
                     'order_date': []
                 }
                 df = pd.DataFrame(orders_data)
-                df.to_excel(self.orders_file, index=False, engine='openpyxl')
-                logging.info("Created orders.xlsx")
+                self.storage.write_table(self.orders_table, df)
+                logging.info("Created orders table")
                 
         except Exception as e:
             logging.error(f"Error initializing files: {e}")
     
-    def get_products(self):
-        """Retrieve all products from Excel file"""
+    def get_products(self, ids=None):
+        """Retrieve products from the catalog, all of them unless ids are given"""
         try:
-            df = pd.read_excel(self.products_file, engine='openpyxl')
-            return df.to_dict('records')
+            return self.catalog.get_products(ids)
         except Exception as e:
             logging.error(f"Error reading products: {e}")
             return []
     
-    def get_orders(self):
-        """Retrieve all orders from Excel file grouped by order_id"""
+    def get_product(self, product_id):
+        """Retrieve one product from the catalog by id"""
         try:
-            logging.debug(f"Reading orders from {self.orders_file}")
-            df = pd.read_excel(self.orders_file, engine='openpyxl')
-            logging.debug(f"Read {len(df)} rows from orders file")
-            
-            if df.empty:
-                logging.debug("Orders dataframe is empty")
-                return []
-            
-            # Ensure order_id column exists and convert to numeric
-            if 'order_id' not in df.columns:
-                logging.error("order_id column not found in orders file")
-                return []
-                
-            # Group orders by order_id
-            orders = []
-            order_groups = df.groupby('order_id')
-            logging.debug(f"Found {len(order_groups)} unique orders")
-            
-            for order_id, group in order_groups:
-                logging.debug(f"Processing order {order_id}")
-                order_total = group['total'].sum()
-                order_date = group['order_date'].iloc[0]
-                
-                items = []
-                for _, item in group.iterrows():
-                    items.append({
-                        'product_name': item['product_name'],
-                        'quantity': int(item['quantity']),
-                        'price': float(item['price']),
-                        'total': float(item['total'])
-                    })
-                
-                orders.append({
-                    'order_id': int(order_id),
-                    'items': items,
-                    'total': float(order_total),
-                    'order_date': order_date
-                })
-            
-            # Sort by order_id descending (newest first)
-            orders.sort(key=lambda x: x['order_id'], reverse=True)
-            logging.debug(f"Returning {len(orders)} orders")
-            return orders
-            
+            return self.catalog.get_product(product_id)
+        except Exception as e:
+            logging.error(f"Error reading product {product_id}: {e}")
+            return None
+    
+    def get_orders(self, limit=None, offset=0):
+        """Retrieve orders newest first, optionally one page at a time"""
+        try:
+            self.order_archive.sync()
+            with self.order_archive.lock:
+                return self.order_archive.get_orders(limit, offset)
         except Exception as e:
             logging.error(f"Error reading orders: {e}")
-            import traceback
-            logging.error(traceback.format_exc())
             return []
     
+    def get_order_page(self, limit, cursor=None):
+        """Retrieve up to limit orders older than cursor, returning (orders, next_cursor)"""
+        try:
+            self.order_archive.sync()
+            with self.order_archive.lock:
+                return self.order_archive.get_page(limit, int(cursor) if cursor else None)
+        except Exception as e:
+            logging.error(f"Error reading orders page: {e}")
+            return [], None
+    
+    def get_order(self, order_id):
+        """Retrieve one order by id"""
+        try:
+            self.order_archive.sync()
+            with self.order_archive.lock:
+                return self.order_archive.get_order(int(order_id))
+        except Exception as e:
+            logging.error(f"Error reading order {order_id}: {e}")
+            return None
+    
+    def get_purchase_history(self):
+        """Get per-product purchase statistics for restock forecasting"""
+        try:
+            return self.purchase_history.snapshot()
+        except Exception as e:
+            logging.error(f"Error reading purchase history: {e}")
+            return {}
+    
+    def count_orders(self):
+        """Count the orders placed so far"""
+        try:
+            self.order_archive.sync()
+            with self.order_archive.lock:
+                return len(self.order_archive)
+        except Exception as e:
+            logging.error(f"Error counting orders: {e}")
+            return 0
+    
     def create_order(self, cart):
         """Create a new order from cart items"""
         try:
-            # Generate order ID
-            existing_orders = self.get_orders()
-            order_id = len(existing_orders) + 1
-            
-            # Read existing orders
-            try:
-                df = pd.read_excel(self.orders_file, engine='openpyxl')
-            except:
-                df = pd.DataFrame(columns=['order_id', 'product_name', 'quantity', 'price', 'total', 'order_date'])
+            # Allocate the order ID from the persisted counter
+            order_id = self.storage.next_id(self.orders_table, seed=self._max_order_id)
             
             # Add cart items to orders
             order_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
+            new_rows = []
             for item in cart.values():
-                new_row = {
+                new_rows.append({
                     'order_id': order_id,
                     'product_name': item['name'],
                     'quantity': item['quantity'],
                     'price': item['price'],
                     'total': item['price'] * item['quantity'],
                     'order_date': order_date
-                }
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                })
             
-            # Save to Excel
-            df.to_excel(self.orders_file, index=False, engine='openpyxl')
+            # Append every cart line to the order log in one write
+            self.storage.append_rows(self.orders_table, new_rows)
             logging.info(f"Created order {order_id}")
             return order_id
             
         except Exception as e:
             logging.error(f"Error creating order: {e}")
             return None
+    
+    def _max_order_id(self):
+        """Get the highest order ID stored so far, used to seed the order counter"""
+        df = self.storage.read_table(self.orders_table)
+        if df.empty or 'order_id' not in df.columns:
+            return 0
+        return int(df['order_id'].max())
+    
+    def compact_orders(self):
+        """Fold appended orders back into the orders table's workbook"""
+        try:
+            self.storage.compact(self.orders_table)
+            return True
+        except Exception as e:
+            logging.error(f"Error compacting orders: {e}")
+            return False
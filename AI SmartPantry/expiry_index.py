@@ -0,0 +1,119 @@
+import bisect
+import heapq
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+from table_mirror import parse_dates
+
+# How often the sweeper re-syncs with storage to pick up other workers' writes, in seconds
+EXPIRY_SWEEP_INTERVAL = 60
+
+
+class ExpiryIndex:
+    """Pantry rows ordered by expiry date, kept current as rows are added and removed
+
+    Entries are (expiry, label) pairs in a sorted list, expiry being
+    nanoseconds since the epoch. Labels grow in storage order, so rows that
+    expire on the same day stay in storage order. The rows expiring by a
+    date are a prefix of the list found with one bisect. Rows without an
+    expiry date are left out. The version counts changes, and changed is set
+    on every change so a sweeper can wake up for it.
+    """
+
+    def __init__(self, column='expiry_date'):
+        self.column = column
+        self.version = 0
+        self.changed = threading.Event()
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed row"""
+        self.entries = []
+        self._touch()
+
+    def _touch(self):
+        """Record a change"""
+        self.version += 1
+        self.changed.set()
+
+    def _entries(self, frame):
+        """Get the sorted (expiry, label) pairs of the rows that have an expiry date"""
+        if self.column not in frame.columns:
+            return []
+        dates = parse_dates(frame[self.column])
+        dates = dates[dates.notna()]
+        return sorted(zip(dates.to_numpy(dtype='datetime64[ns]').astype('int64').tolist(), dates.index))
+
+    def add(self, frame):
+        """Index rows, merging them into the sorted list"""
+        entries = self._entries(frame)
+        if not entries:
+            return
+        if not self.entries or entries[0] >= self.entries[-1]:
+            self.entries.extend(entries)
+        elif len(entries) == 1:
+            bisect.insort(self.entries, entries[0])
+        else:
+            self.entries = list(heapq.merge(self.entries, entries))
+        self._touch()
+
+    def remove(self, frame):
+        """Unindex rows"""
+        for entry in self._entries(frame):
+            position = bisect.bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                self.entries.pop(position)
+        self._touch()
+
+    def expiring_by(self, threshold):
+        """Get the (expiry, label) pairs of rows expiring on or before threshold, soonest first"""
+        end = bisect.bisect_right(self.entries, (pd.Timestamp(threshold).value, sys.maxsize))
+        return self.entries[:end]
+
+
+class ExpirySweeper:
+    """Background thread that keeps the expiring-items buckets precomputed
+
+    It refreshes whenever the expiry index changes, once the day rolls over,
+    and every interval seconds so that writes from other workers are seen.
+    A refresh is whatever callable it is given. The thread is a daemon, so it
+    never keeps the process alive.
+    """
+
+    def __init__(self, index, refresh, interval=EXPIRY_SWEEP_INTERVAL):
+        self.index = index
+        self.refresh = refresh
+        self.interval = interval
+        self.stopping = False
+        self.sweeps = 0
+        self.thread = threading.Thread(target=self._run, name='expiry-sweeper', daemon=True)
+
+    def start(self):
+        """Start sweeping"""
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop sweeping and wait for the thread to finish"""
+        self.stopping = True
+        self.index.changed.set()
+        self.thread.join()
+
+    def _seconds_to_midnight(self):
+        """Get the seconds left until the day rolls over"""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds()
+
+    def _run(self):
+        while not self.stopping:
+            self.index.changed.clear()
+            try:
+                self.refresh()
+                self.sweeps += 1
+            except Exception as e:
+                logging.error(f"Error sweeping expiring items: {e}")
+            self.index.changed.wait(min(self.interval, self._seconds_to_midnight() + 1))
@@ -0,0 +1,217 @@
+import bisect
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets, in seconds
+HISTOGRAM_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Rows of profiler output returned for a profiled request
+PROFILE_ROWS = 40
+
+# Set PANTRY_PROFILING=1 to let a request ask for a profile with ?profile=1
+PROFILING_ENABLED = os.environ.get('PANTRY_PROFILING', '').lower() in ('1', 'true', 'yes')
+
+# Stages reported in the Server-Timing header, in order
+STAGES = ['io', 'compute', 'render']
+
+# The timings of the request being served, and the stages currently being timed
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+_open_stages = contextvars.ContextVar('open_stages', default=frozenset())
+
+
+class Histogram:
+    """Cumulative latency histogram with one series per label value"""
+
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, label_value, seconds):
+        """Count one observation"""
+        position = bisect.bisect_left(HISTOGRAM_BUCKETS, seconds)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [[0] * (len(HISTOGRAM_BUCKETS) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += seconds
+
+    def render(self):
+        """Render the histogram in the Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {label_value: (list(counts), total) for label_value, (counts, total) in self.series.items()}
+        for label_value, (counts, total) in sorted(series.items()):
+            label = f'{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, count in zip(HISTOGRAM_BUCKETS + ['+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+method_seconds = Histogram('smartpantry_method_seconds', 'Time spent in manager and storage methods', 'method')
+request_seconds = Histogram('smartpantry_request_seconds', 'Time spent serving requests', 'endpoint')
+stage_seconds = Histogram('smartpantry_request_stage_seconds', 'Time each request spent per stage', 'stage')
+
+
+class RequestTimings:
+    """Stage durations accumulated while serving one request
+
+    Only the outermost timed call of a stage counts, so a manager method
+    calling another isn't counted twice. Storage I/O made inside a manager
+    method is also recorded so it can be taken out of that method's compute time.
+    Timed calls are kept as intervals and a stage's duration is the wall-clock
+    time they cover, so loaders running at once on pool threads count once.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.intervals = {}
+        self.render_started = None
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_interval(self, stage, start, end):
+        """Record that a stage ran from start to end"""
+        with self.lock:
+            self.intervals.setdefault(stage, []).append((start, end))
+
+    def breakdown(self):
+        """Get each reported stage's duration in seconds, with compute excluding the I/O it waited on"""
+        with self.lock:
+            stages = dict(self.stages)
+            intervals = {stage: list(spans) for stage, spans in self.intervals.items()}
+        for stage, spans in intervals.items():
+            stages[stage] = stages.get(stage, 0.0) + _covered(spans)
+        stages['compute'] = max(stages['compute'] - stages.pop('io_in_compute', 0.0), 0.0)
+        stages['total'] = time.perf_counter() - self.start
+        return stages
+
+
+def _covered(spans):
+    """Get the total time covered by (start, end) intervals, counting overlaps once"""
+    covered = 0.0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
+
+
+def timed(name, stage):
+    """Decorate a function so each call is recorded under name and counted towards a request stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            open_stages = _open_stages.get()
+            token = _open_stages.set(open_stages | {stage})
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                _open_stages.reset(token)
+                method_seconds.observe(name, end - start)
+                timings = _request_timings.get()
+                if timings is not None and stage not in open_stages:
+                    timings.add_interval(stage, start, end)
+                    if stage == 'io' and 'compute' in open_stages:
+                        timings.add_interval('io_in_compute', start, end)
+        return wrapper
+    return decorate
+
+
+def instrument(stage, methods=None):
+    """Class decorator that times the class's public methods, or just the named ones, under a stage"""
+    def decorate(cls):
+        for name, value in list(vars(cls).items()):
+            if not callable(value) or name.startswith('_') or (methods is not None and name not in methods):
+                continue
+            setattr(cls, name, timed(f'{cls.__name__}.{name}', stage)(value))
+        return cls
+    return decorate
+
+
+def render_metrics():
+    """Render every histogram in the Prometheus text format"""
+    return '\n'.join(histogram.render() for histogram in (request_seconds, stage_seconds, method_seconds)) + '\n'
+
+
+def install(app):
+    """Time every request of a Flask app, add a Server-Timing header and allow ?profile=1 when enabled"""
+    from flask import before_render_template, g, request, template_rendered
+
+    @app.before_request
+    def start_request_timing():
+        timings = RequestTimings()
+        g.request_timings = timings
+        _request_timings.set(timings)
+        if PROFILING_ENABLED and request.args.get('profile'):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request_timing(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_ROWS)
+            response = app.response_class(output.getvalue(), mimetype='text/plain')
+        timings = g.get('request_timings')
+        if timings is None:
+            return response
+        stages = timings.breakdown()
+        for stage in STAGES:
+            stage_seconds.observe(stage, stages[stage])
+        request_seconds.observe(request.endpoint or 'unmatched', stages['total'])
+        response.headers['Server-Timing'] = ', '.join(
+            f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in stages.items()
+        )
+        return response
+
+    @app.teardown_request
+    def clear_request_timing(exc):
+        if g.pop('request_timings', None) is not None:
+            _request_timings.set(None)
+
+    def render_started(sender, template, context, **extra):
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        timings = _request_timings.get()
+        if timings is not None and timings.render_started is not None:
+            timings.add('render', time.perf_counter() - timings.render_started)
+            timings.render_started = None
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
@@ -0,0 +1,78 @@
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+# Threads shared by every request for loading independent data sources at once
+LOADER_THREADS = int(os.environ.get('PANTRY_LOADER_THREADS', 4))
+
+# Worker processes for parsing workbooks; 0 parses in the calling thread. Parsing
+# is CPU bound and holds the GIL, so only processes let several parses overlap.
+# Workers are spawned and re-import the entry script as __mp_main__, so it must not
+# start a server or build app state then; app.py checks __name__ for both.
+PARSE_PROCESSES = int(os.environ.get('PANTRY_PARSE_PROCESSES', 0))
+
+_pools_lock = threading.Lock()
+_thread_pool = None
+_process_pool = None
+_in_loader = threading.local()
+
+
+def _get_thread_pool():
+    global _thread_pool
+    with _pools_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=LOADER_THREADS, thread_name_prefix='loader')
+        return _thread_pool
+
+
+def _get_process_pool():
+    global _process_pool
+    with _pools_lock:
+        if _process_pool is None:
+            # Spawn rather than fork, since forking a threaded server can copy held locks
+            _process_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def _run_loader(name, loader):
+    """Run one loader on a pool thread, logging and returning None if it fails"""
+    was_active = getattr(_in_loader, 'active', False)
+    _in_loader.active = True
+    try:
+        return loader()
+    except Exception as e:
+        logging.error(f"Error loading {name}: {e}")
+        return None
+    finally:
+        _in_loader.active = was_active
+
+
+def load_parallel(loaders):
+    """Run independent zero-argument loaders at once on the shared pool and return their results by name
+
+    A loader that fails is logged and gives None. Each loader runs in a copy
+    of the caller's context, so request timings still see its I/O. Called
+    from inside a loader, the loaders run in turn instead, so nested fan-outs
+    can't exhaust the pool and deadlock.
+    """
+    if getattr(_in_loader, 'active', False) or LOADER_THREADS <= 1:
+        return {name: _run_loader(name, loader) for name, loader in loaders.items()}
+    pool = _get_thread_pool()
+    futures = {
+        name: pool.submit(contextvars.copy_context().run, _run_loader, name, loader)
+        for name, loader in loaders.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def read_workbook(path):
+    """Parse a workbook into a frame, in a worker process when PANTRY_PARSE_PROCESSES is set"""
+    if PARSE_PROCESSES <= 0:
+        return pd.read_excel(path, engine='openpyxl')
+    return _get_process_pool().submit(pd.read_excel, path, engine='openpyxl').result()
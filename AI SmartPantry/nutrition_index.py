@@ -0,0 +1,203 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Nutrition categories and their benefits, checked in order
+NUTRITION_CATEGORIES = {
+    'High Protein': {
+        'keywords': ['protein'],
+        'benefits': 'Essential for muscle building and repair',
+        'recommendation': 'Great for post-workout recovery',
+        'icon': 'fas fa-dumbbell',
+        'color': 'success'
+    },
+    'Rich in Calcium': {
+        'keywords': ['calcium'],
+        'benefits': 'Supports strong bones and teeth',
+        'recommendation': 'Important for growing children and seniors',
+        'icon': 'fas fa-bone',
+        'color': 'primary'
+    },
+    'High Fiber': {
+        'keywords': ['fiber'],
+        'benefits': 'Aids digestion and heart health',
+        'recommendation': 'Helps maintain healthy weight',
+        'icon': 'fas fa-leaf',
+        'color': 'warning'
+    },
+    'Vitamin Rich': {
+        'keywords': ['vitamin'],
+        'benefits': 'Boosts immune system and energy',
+        'recommendation': 'Essential for daily wellness',
+        'icon': 'fas fa-shield-virus',
+        'color': 'info'
+    },
+    'Iron Source': {
+        'keywords': ['iron'],
+        'benefits': 'Prevents anemia and boosts energy',
+        'recommendation': 'Especially important for women',
+        'icon': 'fas fa-battery-full',
+        'color': 'danger'
+    }
+}
+
+# Nutrients that complement each category, suggested when an item lacks them
+COMPLEMENTARY_NUTRIENTS = {
+    'High Protein': ['iron', 'b12', 'zinc', 'vitamin b6'],
+    'Rich in Calcium': ['magnesium', 'phosphorus', 'vitamin d', 'vitamin k'],
+    'High Fiber': ['prebiotics', 'potassium', 'magnesium', 'vitamin c'],
+    'Vitamin Rich': ['antioxidants', 'beta carotene', 'folate', 'omega-3'],
+    'Iron Source': ['vitamin c', 'b12', 'folate', 'copper']
+}
+MISSING_NUTRIENTS_SHOWN = 3
+
+NUTRITION_FIELDS = ['nutrition_a', 'nutrition_b', 'nutrition_c']
+
+# One nutrition field, such as "Vitamin C: 14%" or "Protein: 25g"
+NUTRIENT_PATTERN = re.compile(r'^\s*([^:]+?)\s*:\s*(\d+(?:\.\d+)?)\s*([^\s\d]*)\s*$')
+
+# Units a parsed amount is normalized to, with the factor that converts to them.
+# Masses become grams, so "Calcium: 300mg" and "Calcium: 0.3g" add up.
+NUTRIENT_UNITS = {
+    'g': ('g', 1.0),
+    'gram': ('g', 1.0),
+    'grams': ('g', 1.0),
+    'kg': ('g', 1000.0),
+    'mg': ('g', 1e-3),
+    'mcg': ('g', 1e-6),
+    'µg': ('g', 1e-6),
+    'ug': ('g', 1e-6),
+    '%': ('%', 1.0),
+    '%dv': ('%', 1.0),
+    'kcal': ('kcal', 1.0),
+    'cal': ('kcal', 1.0),
+    'calories': ('kcal', 1.0),
+    'kj': ('kcal', 1 / 4.184)
+}
+
+
+def parse_nutrient(text):
+    """Parse one nutrition field into a normalized (name, amount, unit) triple, or None if it isn't one"""
+    match = NUTRIENT_PATTERN.match(text)
+    if match is None:
+        return None
+    name, amount, unit = match.groups()
+    unit, factor = NUTRIENT_UNITS.get(unit.lower(), (unit.lower(), 1.0))
+    return ' '.join(name.lower().split()), float(amount) * factor, unit
+
+
+def tag_nutrition(text, fields):
+    """Tag one item's nutrition: its parsed nutrients, matching categories and missing complements"""
+    nutrients = tuple(nutrient for nutrient in map(parse_nutrient, fields) if nutrient is not None)
+    categories = tuple(
+        category for category, info in NUTRITION_CATEGORIES.items()
+        if any(keyword in text for keyword in info['keywords'])
+    )
+    category = categories[0] if categories else None
+    missing = [nutrient.title() for nutrient in COMPLEMENTARY_NUTRIENTS.get(category, ()) if nutrient not in text]
+    return {
+        'text': text,
+        'nutrients': nutrients,
+        'categories': categories,
+        'category': category,
+        'missing_nutrients': ', '.join(missing[:MISSING_NUTRIENTS_SHOWN])
+    }
+
+
+class NutritionIndex:
+    """Nutrition tags per pantry row, computed once as rows are mirrored
+
+    Each row with nutrition fields gets its parsed nutrients and category
+    flags when it enters the mirror, and the tag is computed once per distinct
+    combination of fields. Rows that fall into a category are also kept in
+    storage order, so the highlights are the first few of those and reading
+    them stops as soon as enough are found.
+
+    The index also keeps the total quantity of the rows sharing each tag, so
+    pantry-wide nutrient totals cost one pass over the distinct tags rather
+    than over the rows.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed row"""
+        self.tags = {}
+        self.highlighted = {}
+        self.known_tags = {}
+        self.quantities = {}
+        self.counts = {}
+
+    def add(self, frame):
+        """Tag rows, once per distinct combination of nutrition fields"""
+        fields = [field for field in NUTRITION_FIELDS if field in frame.columns]
+        if frame.empty or not fields:
+            return
+        values = frame[fields]
+        groups = values.groupby(fields, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+        # Tag each distinct combination from its first row
+        _, first_rows = np.unique(groups, return_index=True)
+        tags = [self._tag(row) for row in values.iloc[first_rows].itertuples(index=False)]
+        counts = np.bincount(groups, minlength=len(tags))
+        quantities = np.bincount(groups, weights=self._quantity(frame), minlength=len(tags))
+        for tag, count, quantity in zip(tags, counts.tolist(), quantities.tolist()):
+            if tag is not None:
+                self.counts[tag['key']] = self.counts.get(tag['key'], 0) + count
+                self.quantities[tag['key']] = self.quantities.get(tag['key'], 0.0) + quantity
+        for label, group in zip(frame.index, groups.tolist()):
+            tag = tags[group]
+            if tag is None:
+                continue
+            self.tags[label] = tag
+            if tag['category'] is not None:
+                self.highlighted[label] = tag
+
+    def _quantity(self, frame):
+        """Get each row's quantity as a float array, counting a missing quantity as 0"""
+        if 'quantity' not in frame.columns:
+            return np.zeros(len(frame))
+        return pd.to_numeric(frame['quantity'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    def _tag(self, values):
+        """Tag one combination of nutrition fields, or get None if they are all empty"""
+        present = [str(value).strip() for value in values if not pd.isna(value)]
+        key = tuple(value for value in present if value and value.lower() != 'nan')
+        if not key:
+            return None
+        tag = self.known_tags.get(key)
+        if tag is None:
+            tag = self.known_tags[key] = tag_nutrition(' '.join(value.lower() for value in key), key)
+            tag['key'] = key
+        return tag
+
+    def remove(self, frame):
+        """Untag rows"""
+        for label, quantity in zip(frame.index, self._quantity(frame).tolist()):
+            tag = self.tags.pop(label, None)
+            self.highlighted.pop(label, None)
+            if tag is not None:
+                self.counts[tag['key']] -= 1
+                self.quantities[tag['key']] -= quantity
+
+    def totals(self):
+        """Get (nutrient, unit) -> [amount, items], the amount summed over rows weighted by quantity"""
+        totals = {}
+        for key, count in self.counts.items():
+            if not count:
+                continue
+            quantity = self.quantities[key]
+            for name, amount, unit in self.known_tags[key]['nutrients']:
+                total = totals.setdefault((name, unit), [0.0, 0])
+                total[0] += amount * quantity
+                total[1] += count
+        return totals
+
+    def highlights(self, limit):
+        """Get (label, tag) for the first limit rows that fall into a nutrition category"""
+        found = []
+        for label, tag in self.highlighted.items():
+            if len(found) >= limit:
+                break
+            found.append((label, tag))
+        return found
@@ -0,0 +1,354 @@
+import json
+import os
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from write_coordinator import atomic_write, file_lock
+
+# Bump when the file layout changes so older archives are rebuilt
+ARCHIVE_VERSION = 2
+
+# One order line; product names live in a separate string table and are stored as codes
+LINE_DTYPE = np.dtype([
+    ('order_id', '<i8'),
+    ('product', '<i4'),
+    ('quantity', '<i8'),
+    ('price', '<f8'),
+    ('total', '<f8'),
+    ('order_date', 'S32')
+])
+
+# One order in the offset index: its id, the position of its first line and its precomputed total
+INDEX_DTYPE = np.dtype([('order_id', '<i8'), ('start', '<i8'), ('total', '<f8')])
+
+ORDER_COLUMNS = ['order_id', 'product_name', 'quantity', 'price', 'total', 'order_date']
+
+
+def _normalize(signature):
+    """Turn a storage signature into the form it takes after a round trip through JSON"""
+    return json.loads(json.dumps(signature))
+
+
+def _write_bytes(path, data):
+    """Write bytes to a file"""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class OrderArchive:
+    """Order history kept in memory-mapped files that every worker shares
+
+    The order lines are a NumPy structured array sorted by order id, in a
+    file each process maps read-only, so the history sits once in the page
+    cache instead of once per worker. An offset index of (order_id, start,
+    total) records finds an order's lines with one binary search and keeps
+    its precomputed total, so reads never re-add the lines. Product names
+    are a JSON Lines string table the lines refer to by position. A small
+    JSON meta file, written last, records how much of each file is valid,
+    the storage signature the files match and a generation that changes
+    whenever the files are rewritten.
+
+    Appends made through this process's storage are written onto the ends
+    of the files as they happen. Anything else, such as a delete, a replaced
+    table or lines for an order id no higher than the newest archived one,
+    leaves the meta behind storage and the archive is rebuilt from the table
+    on the next sync.
+
+    Like a TableMirror it accepts indexes with add(frame), remove(frame) and
+    clear() methods, which are fed the archived lines as they are mapped.
+    Query it while holding its lock.
+    """
+
+    def __init__(self, storage, table, directory=None):
+        self.storage = storage
+        self.table = table
+        directory = directory or getattr(storage, 'directory', '.')
+        base = os.path.join(directory, f'{table}.archive')
+        self.lines_path = f'{base}.lines'
+        self.index_path = f'{base}.index'
+        self.names_path = f'{base}.names.jsonl'
+        self.meta_path = f'{base}.json'
+        self.lock = threading.RLock()
+        self.meta = None
+        self.lines = np.empty(0, LINE_DTYPE)
+        self.index = np.empty(0, INDEX_DTYPE)
+        self.names = []
+        self.indexes = []
+        self.rebuilds = 0
+        self.appends = 0
+        self.remaps = 0
+        storage.subscribe(table, self._on_change)
+
+    def add_index(self, index):
+        """Attach a derived index, feeding it the lines already mapped"""
+        with self.lock:
+            self.indexes.append(index)
+            if len(self.lines):
+                index.add(self._frame(0, len(self.lines)))
+
+    @property
+    def frame(self):
+        """Build a frame of every archived line, in order id order"""
+        with self.lock:
+            return self._frame(0, len(self.lines))
+
+    def sync(self):
+        """Bring the archive up to date with storage and map its files"""
+        signature = _normalize(self.storage.signature(self.table))
+        with self.lock:
+            if self.meta is not None and signature is not None and self.meta['signature'] == signature:
+                return self
+        meta = self._read_meta()
+        if meta is None or signature is None or meta['signature'] != signature:
+            meta = self._rebuild(signature)
+        with self.lock:
+            if self.meta is None or meta['generation'] != self.meta['generation'] or meta['lines'] != self.meta['lines']:
+                self._map(meta)
+            else:
+                self.meta = meta
+        return self
+
+    def _read_meta(self):
+        """Read the meta file, or get None if it is missing or from another layout version"""
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if meta.get('version') != ARCHIVE_VERSION or meta.get('backend') != self.storage.backend:
+            return None
+        return meta
+
+    def _write_meta(self, meta):
+        """Atomically replace the meta file"""
+        def write(temp_path):
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+        atomic_write(self.meta_path, write, '.json')
+
+    def _rebuild(self, signature):
+        """Rewrite the archive files from a full read of the table and return their meta"""
+        # Read outside the archive lock so a writer notifying us is never blocked behind the read
+        df = self.storage.read_table(self.table)
+        after = _normalize(self.storage.signature(self.table))
+        with file_lock(self.meta_path):
+            meta = self._read_meta()
+            if meta is not None and meta['signature'] is not None and meta['signature'] == after:
+                # Another worker rebuilt it while we were reading
+                return meta
+            lines, index, names = self._encode(df, {})
+            for path, data in ((self.lines_path, lines), (self.index_path, index)):
+                atomic_write(path, lambda temp_path, data=data: data.tofile(temp_path))
+            names_bytes = ''.join(json.dumps(name) + '\n' for name in names).encode('utf-8')
+            atomic_write(self.names_path, lambda temp_path: _write_bytes(temp_path, names_bytes))
+            meta = {
+                'version': ARCHIVE_VERSION,
+                'backend': self.storage.backend,
+                'generation': uuid.uuid4().hex,
+                # A write that landed during the read may or may not be in df,
+                # so leave the signature unset and let the next sync rebuild again
+                'signature': signature if after == signature else None,
+                'lines': len(lines),
+                'orders': len(index),
+                'names': len(names),
+                'names_bytes': len(names_bytes),
+                'last_order_id': int(index['order_id'][-1]) if len(index) else None
+            }
+            self._write_meta(meta)
+        with self.lock:
+            self.rebuilds += 1
+        return meta
+
+    def _encode(self, df, name_codes, first_line=0):
+        """Encode order lines as (lines, index, new_names), sorted by order id
+
+        name_codes maps the names already in the string table to their codes,
+        and gains the new names. Index starts count from first_line.
+        """
+        if df.empty or any(column not in df.columns for column in ORDER_COLUMNS):
+            return np.empty(0, LINE_DTYPE), np.empty(0, INDEX_DTYPE), []
+        order_ids = pd.to_numeric(df['order_id'], errors='coerce')
+        df = df[order_ids.notna()].assign(order_id=order_ids[order_ids.notna()].astype('int64'))
+        df = df.sort_values('order_id', kind='stable')
+        new_names = []
+        codes = []
+        for name in df['product_name'].tolist():
+            name = None if pd.isna(name) else name
+            code = name_codes.get(name)
+            if code is None:
+                code = name_codes[name] = len(name_codes)
+                new_names.append(name)
+            codes.append(code)
+        lines = np.empty(len(df), LINE_DTYPE)
+        lines['order_id'] = df['order_id'].to_numpy()
+        lines['product'] = codes
+        lines['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).to_numpy().astype('int64')
+        lines['price'] = pd.to_numeric(df['price'], errors='coerce').to_numpy(dtype=float)
+        lines['total'] = pd.to_numeric(df['total'], errors='coerce').to_numpy(dtype=float)
+        lines['order_date'] = [
+            b'' if pd.isna(value) else str(value).encode('utf-8')[:LINE_DTYPE['order_date'].itemsize]
+            for value in df['order_date'].tolist()
+        ]
+        starts = np.flatnonzero(np.r_[True, lines['order_id'][1:] != lines['order_id'][:-1]])
+        index = np.empty(len(starts), INDEX_DTYPE)
+        index['order_id'] = lines['order_id'][starts]
+        index['start'] = starts + first_line
+        index['total'] = np.add.reduceat(lines['total'], starts)
+        return lines, index, new_names
+
+    def _on_change(self, table, before, after, changes):
+        """Write appended lines onto the archive, or leave it stale if it missed a write"""
+        before = _normalize(before)
+        with file_lock(self.meta_path):
+            meta = self._read_meta()
+            if meta is None or meta['signature'] is None or meta['signature'] != before:
+                return
+            rows = []
+            for change in changes:
+                if change[0] != 'append':
+                    # Deletes and replacements are picked up by a rebuild
+                    return
+                rows.extend(change[1])
+            if rows and not self._append(meta, pd.DataFrame(rows)):
+                return
+            meta['signature'] = _normalize(after)
+            self._write_meta(meta)
+        with self.lock:
+            self.appends += 1
+
+    def _append(self, meta, df):
+        """Write new lines onto the ends of the archive files, updating meta; False if they don't fit on the end"""
+        with self.lock:
+            name_codes = {name: code for code, name in enumerate(self._read_names(meta)[0])}
+        lines, index, names = self._encode(df, name_codes, meta['lines'])
+        if not len(lines):
+            return True
+        last_order_id = meta['last_order_id']
+        if last_order_id is not None and lines['order_id'][0] < last_order_id:
+            return False
+        if last_order_id is not None and index['order_id'][0] == last_order_id:
+            # The newest order's total would change under workers that have its record mapped
+            return False
+        names_bytes = ''.join(json.dumps(name) + '\n' for name in names).encode('utf-8')
+        # Drop anything a writer left past the valid end before it could update the meta
+        for path, data, valid in (
+            (self.lines_path, lines.tobytes(), meta['lines'] * LINE_DTYPE.itemsize),
+            (self.index_path, index.tobytes(), meta['orders'] * INDEX_DTYPE.itemsize),
+            (self.names_path, names_bytes, meta['names_bytes'])
+        ):
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                f.truncate(valid)
+                f.seek(valid)
+                f.write(data)
+        meta['lines'] += len(lines)
+        meta['orders'] += len(index)
+        meta['names'] += len(names)
+        meta['names_bytes'] += len(names_bytes)
+        meta['last_order_id'] = int(lines['order_id'][-1])
+        return True
+
+    def _read_names(self, meta):
+        """Get the string table described by meta, reading only the names past those already loaded"""
+        if self.meta is not None and self.meta['generation'] == meta['generation'] and len(self.names) <= meta['names']:
+            start, names = self.meta['names_bytes'], list(self.names)
+        else:
+            start, names = 0, []
+        with open(self.names_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(meta['names_bytes'] - start)
+        names.extend(json.loads(line) for line in data.decode('utf-8').splitlines())
+        return names, meta['names_bytes']
+
+    def _map(self, meta):
+        """Map the files described by meta and feed the indexes the lines they haven't seen"""
+        same_generation = self.meta is not None and self.meta['generation'] == meta['generation']
+        seen = len(self.lines) if same_generation else 0
+        self.names = self._read_names(meta)[0]
+        self.lines = self._map_file(self.lines_path, LINE_DTYPE, meta['lines'])
+        self.index = self._map_file(self.index_path, INDEX_DTYPE, meta['orders'])
+        self.meta = meta
+        self.remaps += 1
+        for index in self.indexes:
+            if not same_generation:
+                index.clear()
+            if len(self.lines) > seen:
+                index.add(self._frame(seen, len(self.lines)))
+
+    def _map_file(self, path, dtype, count):
+        """Map the first count records of a file read-only"""
+        if not count:
+            return np.empty(0, dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+    def _frame(self, start, end):
+        """Build a frame of archived lines start to end"""
+        lines = self.lines[start:end]
+        names = np.array(self.names, dtype=object)
+        return pd.DataFrame({
+            'order_id': np.asarray(lines['order_id']),
+            'product_name': names[lines['product']] if len(lines) else np.empty(0, dtype=object),
+            'quantity': np.asarray(lines['quantity']),
+            'price': np.asarray(lines['price']),
+            'total': np.asarray(lines['total']),
+            'order_date': [value.decode('utf-8') or None for value in lines['order_date'].tolist()]
+        }, index=pd.RangeIndex(start, end))
+
+    def _order(self, position):
+        """Build the order at a position of the offset index"""
+        start = int(self.index['start'][position])
+        end = int(self.index['start'][position + 1]) if position + 1 < len(self.index) else len(self.lines)
+        lines = self.lines[start:end]
+        items = [
+            {'product_name': self.names[product], 'quantity': quantity, 'price': price, 'total': total}
+            for product, quantity, price, total in zip(
+                lines['product'].tolist(), lines['quantity'].tolist(),
+                lines['price'].tolist(), lines['total'].tolist()
+            )
+        ]
+        return {
+            'order_id': int(self.index['order_id'][position]),
+            'items': items,
+            'total': float(self.index['total'][position]),
+            'order_date': lines['order_date'][0].decode('utf-8') or None
+        }
+
+    def _orders(self, start, end):
+        """Build the orders between two positions of the offset index, newest first"""
+        return [self._order(position) for position in range(end - 1, start - 1, -1)]
+
+    def get_order(self, order_id):
+        """Get one order by id, or None"""
+        position = int(np.searchsorted(self.index['order_id'], order_id))
+        if position < len(self.index) and self.index['order_id'][position] == order_id:
+            return self._order(position)
+        return None
+
+    def get_orders(self, limit=None, offset=0):
+        """Get a page of orders, newest first"""
+        end = max(len(self.index) - offset, 0)
+        start = 0 if limit is None else max(end - limit, 0)
+        return self._orders(start, end)
+
+    def get_page(self, limit, cursor=None):
+        """Get (orders, next_cursor) for up to limit orders older than the cursor order id"""
+        end = len(self.index) if cursor is None else int(np.searchsorted(self.index['order_id'], cursor))
+        start = max(end - limit, 0)
+        orders = self._orders(start, end)
+        return orders, (orders[-1]['order_id'] if start > 0 else None)
+
+    def stats(self):
+        """Get size and maintenance counters for the archive"""
+        with self.lock:
+            return {
+                'lines': len(self.lines),
+                'orders': len(self.index),
+                'mapped_bytes': int(self.lines.nbytes + self.index.nbytes),
+                'rebuilds': self.rebuilds,
+                'appends': self.appends,
+                'remaps': self.remaps
+            }
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,244 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from datetime import date, datetime, timedelta
+import openpyxl
+import pandas as pd
+from allergen_index import ALLERGEN_SEPARATORS
+from categorizer import categorizer
+
+# Rows read, validated and written per chunk of a bulk import
+IMPORT_CHUNK_ROWS = 1000
+
+# Rejected rows reported one by one; any beyond this are only counted
+MAX_REPORTED_ERRORS = 50
+
+# File extensions accepted for a bulk import
+IMPORT_FORMATS = {'.csv': 'csv', '.xlsx': 'xlsx'}
+
+# Pantry columns an import may fill; the rest of the row comes from the pantry defaults
+TEXT_FIELDS = ['barcode', 'product_name', 'photo', 'category', 'storage_tags', 'unit', 'description',
+               'nutrition_a', 'nutrition_b', 'nutrition_c', 'allergens', 'disposal_methods', 'donate_option',
+               'warranty', 'restock_description']
+
+# Other spellings accepted in a header row, after lowercasing and joining words with underscores
+COLUMN_ALIASES = {
+    'name': 'product_name',
+    'product': 'product_name',
+    'item': 'product_name',
+    'qty': 'quantity',
+    'expiry': 'expiry_date',
+    'expires': 'expiry_date',
+    'best_before': 'expiry_date',
+    'storage': 'storage_tags',
+    'location': 'storage_tags',
+    'image': 'photo'
+}
+
+
+class ImportRowError(ValueError):
+    """A row that can't be imported, carrying its line in the file"""
+
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+def import_format(filename):
+    """Get the import format for a file name from its extension"""
+    file_format = IMPORT_FORMATS.get(os.path.splitext(str(filename or ''))[1].lower())
+    if file_format is None and str(filename).lower() in IMPORT_FORMATS.values():
+        file_format = str(filename).lower()
+    if file_format is None:
+        raise ValueError(f"Unsupported import file {filename!r}; expected one of {', '.join(IMPORT_FORMATS)}")
+    return file_format
+
+
+def new_import_report():
+    """Start the report of one import"""
+    return {'imported': 0, 'rows': 0, 'rejected': 0, 'errors': []}
+
+
+def _column(header):
+    """Map a header cell to the pantry column it names"""
+    column = '_'.join(str(header or '').strip().lower().split())
+    return COLUMN_ALIASES.get(column, column)
+
+
+def _iter_csv(stream):
+    """Yield (line, values) for the rows of a CSV file, the header first"""
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    for values in reader:
+        yield reader.line_num, values
+
+
+def _iter_xlsx(stream):
+    """Yield (line, values) for the rows of the first sheet of a workbook, the header first"""
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for line, values in enumerate(workbook.worksheets[0].iter_rows(values_only=True), 1):
+            yield line, values
+    finally:
+        workbook.close()
+
+
+def iter_raw_rows(stream, file_format):
+    """Yield (line, row dict) for each non-blank data row of a file, keyed by pantry column"""
+    rows = _iter_csv(stream) if file_format == 'csv' else _iter_xlsx(stream)
+    _, header = next(rows, (0, None))
+    if header is None:
+        return
+    columns = [_column(value) for value in header]
+    if 'product_name' not in columns:
+        raise ValueError("The file has no product_name column")
+    for line, values in rows:
+        if all(value is None or str(value).strip() == '' for value in values):
+            continue
+        yield line, dict(zip(columns, values))
+
+
+def _text(value):
+    """Normalize a cell to stripped text, turning whole floats such as barcodes back into integers"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _number(raw, column, integer=False):
+    """Parse a non-negative number cell, or get None if it is blank"""
+    text = _text(raw.get(column))
+    if not text:
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        raise ValueError(f"{column} is not a number: {text!r}")
+    if pd.isna(value) or value < 0:
+        raise ValueError(f"{column} must be zero or more: {text!r}")
+    if integer and not value.is_integer():
+        raise ValueError(f"{column} must be a whole number: {text!r}")
+    return int(value) if value.is_integer() else value
+
+
+def normalize_row(raw):
+    """Validate one row and turn it into pantry item data, leaving the expiry date unparsed"""
+    item = {column: _text(raw[column]) for column in TEXT_FIELDS if column in raw}
+    item = {column: value for column, value in item.items() if value}
+    if not item.get('product_name'):
+        raise ValueError("product_name is empty")
+    if 'allergens' in item:
+        tokens = {}
+        for token in ALLERGEN_SEPARATORS.split(item['allergens']):
+            if token.strip():
+                tokens.setdefault(token.strip().lower(), token.strip())
+        item['allergens'] = ', '.join(tokens.values())
+    for column, integer in (('quantity', False), ('price', False), ('restock_days', True)):
+        value = _number(raw, column, integer)
+        if value is not None:
+            item[column] = value
+    expiry = raw.get('expiry_date')
+    if isinstance(expiry, (date, datetime)):
+        item['expiry_date'] = expiry
+    elif _text(expiry):
+        item['expiry_date'] = _text(expiry)
+    return item
+
+
+def normalize_chunk(raw_rows, today, report, strict=False):
+    """Validate a chunk of (line, row dict) pairs and fill in what the rows leave out, in batch
+
+    Expiry dates are parsed together, and rows missing their category,
+    storage tag, expiry date or restock interval get them from the product
+    categorizer, once per distinct product name. Rejected rows are counted
+    in the report, or raise ImportRowError when strict.
+    """
+    items = []
+    lines = []
+    for line, raw in raw_rows:
+        report['rows'] += 1
+        try:
+            items.append(normalize_row(raw))
+            lines.append(line)
+        except ValueError as e:
+            _reject(report, line, str(e), strict)
+
+    expiry = pd.Series([item.get('expiry_date') for item in items], dtype=object)
+    parsed = pd.to_datetime(expiry, errors='coerce', format='mixed')
+    valid = []
+    for line, item, value, date_value in zip(lines, items, expiry.tolist(), parsed.tolist()):
+        if value is not None and pd.isna(date_value):
+            _reject(report, line, f"expiry_date is not a date: {value!r}", strict)
+            continue
+        if value is not None:
+            item['expiry_date'] = date_value.strftime('%Y-%m-%d')
+        valid.append(item)
+
+    categories = {
+        name: categorizer.categorize(name)
+        for name in {item['product_name'] for item in valid}
+    }
+    for item in valid:
+        category, expiry_days, storage_tag = categories[item['product_name']]
+        item.setdefault('category', category)
+        item.setdefault('storage_tags', storage_tag)
+        item.setdefault('expiry_date', (today + timedelta(days=expiry_days)).strftime('%Y-%m-%d'))
+        item.setdefault('restock_days', expiry_days)
+    return valid
+
+
+def _reject(report, line, message, strict):
+    """Count a rejected row, or stop the import when strict"""
+    if strict:
+        raise ImportRowError(line, message)
+    report['rejected'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'line': line, 'error': message})
+
+
+def read_pantry_file(stream, file_format, report, today=None, strict=False, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Stream a CSV or XLSX file as chunks of validated pantry item data, holding one chunk at a time"""
+    today = today or datetime.now()
+    chunk = []
+    for line, raw in iter_raw_rows(stream, file_format):
+        chunk.append((line, raw))
+        if len(chunk) >= chunk_rows:
+            items = normalize_chunk(chunk, today, report, strict)
+            chunk = []
+            if items:
+                yield items
+    items = normalize_chunk(chunk, today, report, strict)
+    if items:
+        yield items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import pantry items from a CSV or XLSX file')
+    parser.add_argument('path', help='the CSV or XLSX file to import')
+    parser.add_argument('--format', choices=sorted(IMPORT_FORMATS.values()), help='override the format the extension implies')
+    parser.add_argument('--backend', choices=['excel', 'sqlite'], help='storage backend, PANTRY_STORAGE_BACKEND by default')
+    parser.add_argument('--strict', action='store_true', help='import nothing if any row is invalid')
+    parser.add_argument('--chunk-rows', type=int, default=IMPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Imported here because the pantry manager imports this module
+    from pantry_manager import PantryManager
+    from storage import get_storage
+
+    manager = PantryManager(get_storage(args.backend))
+    with open(args.path, 'rb') as f:
+        report = manager.import_pantry_file(f, import_format(args.format or args.path), args.strict, args.chunk_rows)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if 'error' in report else 0)
+
+
+if __name__ == '__main__':
+    main()
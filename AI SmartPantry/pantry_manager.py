@@ -1,20 +1,71 @@
 import pandas as pd
-import os
+import numpy as np
 from datetime import datetime, timedelta
 import logging
+from storage import get_storage
+from instrumentation import instrument
+from categorizer import categorizer
+from table_mirror import TableMirror
+from allergen_index import AllergenIndex, expand_allergen_terms
+from search_index import SearchIndex
+from nutrition_index import NutritionIndex, NUTRITION_CATEGORIES
+from expiry_index import ExpiryIndex, ExpirySweeper
+from serialization import fill_defaults
+from restock_forecast import forecast_restock
+from loader_pool import load_parallel
+from pantry_import import IMPORT_CHUNK_ROWS, new_import_report, read_pantry_file
 
+# Items that need quick use after opening, keyed by category
+QUICK_USE_CATEGORIES = {
+    'Dairy': 'Use within 3-5 days after opening',
+    'Meat': 'Use within 1-2 days after opening',
+    'Seafood': 'Use within 1 day after opening',
+    'Beverage': 'Best consumed within 3-7 days after opening',
+    'Condiments': 'Use within 30 days after opening',
+    'Produce': 'Best consumed within 2-3 days after cutting/opening'
+}
+
+# Pantry text columns kept as categoricals in the in-memory pantry store. Items
+# come from a small product catalog, so even names and descriptions repeat a lot.
+PANTRY_CATEGORICAL_COLUMNS = ['product_name', 'photo', 'category', 'storage_tags', 'unit', 'description',
+                              'nutrition_a', 'nutrition_b', 'nutrition_c', 'allergens', 'disposal_methods',
+                              'donate_option', 'warranty', 'restock_description']
+
+# Pantry date columns kept parsed in the in-memory pantry store
+PANTRY_DATE_COLUMNS = ['expiry_date', 'date_added']
+
+# Expiry urgency buckets for <= 0, <= 1, <= 2 and more days remaining
+URGENCY_LEVELS = ['expired', 'critical', 'urgent', 'normal']
+URGENCY_CLASSES = ['bg-dark', 'bg-danger', 'bg-warning', 'bg-info']
+
+@instrument('compute')
 class PantryManager:
-    def __init__(self):
-        self.pantry_file = 'pantry_items.xlsx'
-        self.allergens_file = 'user_allergens.xlsx'
-        self.warranty_file = 'warranty_items.xlsx'
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+        self.pantry_table = 'pantry_items'
+        self.allergens_table = 'user_allergens'
+        self.warranty_table = 'warranty_items'
         self.initialize_files()
+        self.pantry_mirror = TableMirror(
+            self.storage, self.pantry_table, PANTRY_CATEGORICAL_COLUMNS, PANTRY_DATE_COLUMNS, fill_defaults
+        )
+        self.allergen_index = AllergenIndex()
+        self.pantry_mirror.add_index(self.allergen_index)
+        self.search_index = SearchIndex()
+        self.pantry_mirror.add_index(self.search_index)
+        self.nutrition_index = NutritionIndex()
+        self.pantry_mirror.add_index(self.nutrition_index)
+        self.expiry_index = ExpiryIndex()
+        self.pantry_mirror.add_index(self.expiry_index)
+        self._expiring = {}
+        self.expiry_sweeper = None
+        self._allergen_terms = None
     
     def initialize_files(self):
-        """Initialize Excel files for pantry management"""
+        """Initialize storage tables for pantry management"""
         try:
-            # Initialize pantry items file
-            if not os.path.exists(self.pantry_file):
+            # Initialize pantry items table
+            if not self.storage.exists(self.pantry_table):
                 # Add sample pantry items
                 from datetime import datetime, timedelta
                 
@@ -49,22 +100,22 @@ class PantryManager:
                     'restock_days': [3, 5, 14, 7, 10]
                 }
                 df = pd.DataFrame(pantry_data)
-                df.to_excel(self.pantry_file, index=False, engine='openpyxl')
-                logging.info("Created pantry_items.xlsx")
+                self.storage.write_table(self.pantry_table, df)
+                logging.info("Created pantry_items table")
             
-            # Initialize user allergens file
-            if not os.path.exists(self.allergens_file):
+            # Initialize user allergens table
+            if not self.storage.exists(self.allergens_table):
                 allergens_data = {
                     'allergen': [],
                     'severity': [],
                     'date_added': []
                 }
                 df = pd.DataFrame(allergens_data)
-                df.to_excel(self.allergens_file, index=False, engine='openpyxl')
-                logging.info("Created user_allergens.xlsx")
+                self.storage.write_table(self.allergens_table, df)
+                logging.info("Created user_allergens table")
             
-            # Initialize warranty file
-            if not os.path.exists(self.warranty_file):
+            # Initialize warranty table
+            if not self.storage.exists(self.warranty_table):
                 warranty_data = {
                     'product_name': ['Laptop Computer', 'Smartphone', 'Smart TV'],
                     'purchase_date': ['2024-01-15', '2024-03-20', '2024-02-10'],
@@ -74,149 +125,195 @@ class PantryManager:
                     'extension_cost': [99.99, 0, 149.99]
                 }
                 df = pd.DataFrame(warranty_data)
-                df.to_excel(self.warranty_file, index=False, engine='openpyxl')
-                logging.info("Created warranty_items.xlsx")
+                self.storage.write_table(self.warranty_table, df)
+                logging.info("Created warranty_items table")
                 
         except Exception as e:
             logging.error(f"Error initializing pantry files: {e}")
     
     def add_pantry_item(self, item_data):
         """Add item to pantry"""
+        return self.add_pantry_items([item_data])
+    
+    def add_pantry_items(self, items):
+        """Add several items to pantry in a single write"""
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            new_row = {
-                'barcode': item_data.get('barcode', ''),
-                'product_name': item_data.get('product_name', ''),
-                'photo': item_data.get('photo', ''),
-                'price': item_data.get('price', 0),
-                'category': item_data.get('category', ''),
-                'storage_tags': item_data.get('storage_tags', ''),
-                'expiry_date': item_data.get('expiry_date', ''),
-                'quantity': item_data.get('quantity', 1),
-                'unit': item_data.get('unit', 'pcs'),
-                'date_added': datetime.now().strftime('%Y-%m-%d'),
-                'description': item_data.get('description', ''),
-                'nutrition_a': item_data.get('nutrition_a', ''),
-                'nutrition_b': item_data.get('nutrition_b', ''),
-                'nutrition_c': item_data.get('nutrition_c', ''),
-                'allergens': item_data.get('allergens', ''),
-                'disposal_methods': item_data.get('disposal_methods', 'standard'),
-                'donate_option': item_data.get('donate_option', ''),
-                'warranty': item_data.get('warranty', ''),
-                'restock_description': item_data.get('restock_description', ''),
-                'restock_days': item_data.get('restock_days', 7)
-            }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df.to_excel(self.pantry_file, index=False, engine='openpyxl')
+            date_added = datetime.now().strftime('%Y-%m-%d')
+            new_rows = [self._build_pantry_row(item_data, date_added) for item_data in items]
+            self.storage.append_rows(self.pantry_table, new_rows)
             return True
         except Exception as e:
             logging.error(f"Error adding pantry item: {e}")
             return False
     
-    def get_pantry_items(self):
-        """Get all pantry items"""
+    def import_pantry_file(self, stream, file_format, strict=False, chunk_rows=IMPORT_CHUNK_ROWS):
+        """Stream pantry items from a CSV or XLSX file into the pantry in one write, returning the import report
+
+        Rows are validated, categorized and written a chunk at a time, so
+        memory stays bounded whatever the size of the file. Invalid rows are
+        skipped and reported, or with strict nothing is imported. If the
+        import fails, the report has an error and the pantry is unchanged.
+        """
+        report = new_import_report()
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            return df.to_dict('records')
+            now = datetime.now()
+            date_added = now.strftime('%Y-%m-%d')
+            chunks = (
+                [self._build_pantry_row(item_data, date_added) for item_data in items]
+                for items in read_pantry_file(stream, file_format, report, now, strict, chunk_rows)
+            )
+            report['imported'] = self.storage.append_stream(self.pantry_table, chunks)
+        except ValueError as e:
+            report['error'] = str(e)
+        except Exception as e:
+            logging.error(f"Error importing pantry items: {e}")
+            report['error'] = 'The import failed'
+        return report
+    
+    def _build_pantry_row(self, item_data, date_added):
+        """Build a full pantry row from item data, filling in defaults"""
+        return {
+            'barcode': item_data.get('barcode', ''),
+            'product_name': item_data.get('product_name', ''),
+            'photo': item_data.get('photo', ''),
+            'price': item_data.get('price', 0),
+            'category': item_data.get('category', ''),
+            'storage_tags': item_data.get('storage_tags', ''),
+            'expiry_date': item_data.get('expiry_date', ''),
+            'quantity': item_data.get('quantity', 1),
+            'unit': item_data.get('unit', 'pcs'),
+            'date_added': date_added,
+            'description': item_data.get('description', ''),
+            'nutrition_a': item_data.get('nutrition_a', ''),
+            'nutrition_b': item_data.get('nutrition_b', ''),
+            'nutrition_c': item_data.get('nutrition_c', ''),
+            'allergens': item_data.get('allergens', ''),
+            'disposal_methods': item_data.get('disposal_methods', 'standard'),
+            'donate_option': item_data.get('donate_option', ''),
+            'warranty': item_data.get('warranty', ''),
+            'restock_description': item_data.get('restock_description', ''),
+            'restock_days': item_data.get('restock_days', 7)
+        }
+    
+    def get_pantry_items(self, fields=None):
+        """Get all pantry items, limited to fields if given"""
+        try:
+            return list(self.pantry_mirror.records(fields))
         except Exception as e:
             logging.error(f"Error reading pantry items: {e}")
             return []
     
+    def get_pantry_page(self, limit, cursor=None, fields=None):
+        """Get up to limit pantry items after cursor, returning (items, next_cursor)"""
+        try:
+            return self.pantry_mirror.page(limit, cursor, fields)
+        except Exception as e:
+            logging.error(f"Error reading pantry page: {e}")
+            return [], None
+    
+    def search_pantry_items(self, query, limit=None, offset=0):
+        """Search pantry items, returning (items, total) ranked best first"""
+        try:
+            self.pantry_mirror.sync()
+            with self.pantry_mirror.lock:
+                frame = self.pantry_mirror.frame
+                if query.strip():
+                    labels, total = self.search_index.search(query, limit, offset)
+                else:
+                    total = len(frame)
+                    labels = frame.index[offset:None if limit is None else offset + limit]
+            return self.pantry_mirror.materialize(frame.loc[labels]), total
+        except Exception as e:
+            logging.error(f"Error searching pantry: {e}")
+            return [], 0
+    
     def get_items_by_storage_tag(self, tag):
         """Get items filtered by storage tag"""
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            filtered = df[df['storage_tags'].str.contains(tag, na=False)]
-            return filtered.to_dict('records')
+            frame = self.pantry_mirror.sync()
+            return self.pantry_mirror.materialize(frame[frame['storage_tags'].str.contains(tag, na=False)])
         except Exception as e:
             logging.error(f"Error filtering by storage tag: {e}")
             return []
     
-    def get_expiring_items(self, days=7):
-        """Get items expiring within specified days"""
+    def get_expiring_items(self, days=7, today=None):
+        """Get items expiring within specified days, most urgent first"""
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            df['expiry_date'] = pd.to_datetime(df['expiry_date'])
-            
-            today = datetime.now()
-            threshold = today + timedelta(days=days)
-            
-            expiring = df[df['expiry_date'] <= threshold]
-            
-            # Calculate days remaining and add progress information
-            expiring_items = []
-            for _, item in expiring.iterrows():
-                item_dict = item.to_dict()
-                days_remaining = (item['expiry_date'] - today).days
-                
-                # Calculate progress percentage (0% = expired, 100% = full time remaining)
-                progress_percentage = max(0, min(100, (days_remaining / days) * 100))
-                
-                # Determine urgency level
-                if days_remaining <= 0:
-                    urgency = 'expired'
-                    urgency_class = 'bg-dark'
-                elif days_remaining <= 1:
-                    urgency = 'critical'
-                    urgency_class = 'bg-danger'
-                elif days_remaining <= 2:
-                    urgency = 'urgent'
-                    urgency_class = 'bg-warning'
-                else:
-                    urgency = 'normal'
-                    urgency_class = 'bg-info'
-                
-                item_dict.update({
-                    'days_remaining': days_remaining,
-                    'progress_percentage': progress_percentage,
-                    'urgency': urgency,
-                    'urgency_class': urgency_class,
-                    'days_label': 'expired' if days_remaining <= 0 else f'{days_remaining} day{"s" if days_remaining != 1 else ""} left'
-                })
-                
-                expiring_items.append(item_dict)
-            
-            # Sort by urgency (most urgent first)
-            expiring_items.sort(key=lambda x: x['days_remaining'])
-            
-            return expiring_items
+            self.pantry_mirror.sync()
+            if today is not None:
+                return self._expiring_items(days, today)
+            key = (datetime.now().date(), self.expiry_index.version)
+            cached = self._expiring.get(days)
+            if cached is None or cached[0] != key:
+                cached = self._expiring[days] = (key, self._expiring_items(days, datetime.now()))
+            return list(cached[1])
         except Exception as e:
             logging.error(f"Error getting expiring items: {e}")
             return []
     
+    def _expiring_items(self, days, today):
+        """Look up the items expiring within days of today in the expiry index and add urgency and progress"""
+        with self.pantry_mirror.lock:
+            entries = self.expiry_index.expiring_by(today + timedelta(days=days))
+            rows = self.pantry_mirror.frame.loc[[label for _, label in entries]]
+        expiry_dates = pd.to_datetime(pd.Series([expiry for expiry, _ in entries], index=rows.index, dtype='int64'))
+        days_remaining = (expiry_dates - today).dt.days
+        
+        # Calculate progress percentage (0% = expired, 100% = full time remaining)
+        progress_percentage = (days_remaining / days * 100).clip(0, 100)
+        
+        # Determine urgency level
+        conditions = [days_remaining <= 0, days_remaining <= 1, days_remaining <= 2]
+        urgency = np.select(conditions, URGENCY_LEVELS[:3], default=URGENCY_LEVELS[3])
+        urgency_class = np.select(conditions, URGENCY_CLASSES[:3], default=URGENCY_CLASSES[3])
+        
+        days_label = np.where(
+            days_remaining <= 0,
+            'expired',
+            days_remaining.astype(str) + np.where(days_remaining == 1, ' day left', ' days left')
+        )
+        
+        items = self.pantry_mirror.materialize(rows)
+        columns = {
+            'expiry_date': expiry_dates.tolist(),
+            'days_remaining': days_remaining.tolist(),
+            'progress_percentage': progress_percentage.tolist(),
+            'urgency': urgency.tolist(),
+            'urgency_class': urgency_class.tolist(),
+            'days_label': days_label.tolist()
+        }
+        for position, item in enumerate(items):
+            for column, values in columns.items():
+                item[column] = values[position]
+        return items
+    
+    def start_expiry_sweeper(self, days=7):
+        """Precompute the expiring items in a background thread whenever the pantry or the date changes"""
+        if self.expiry_sweeper is None:
+            self.expiry_sweeper = ExpirySweeper(self.expiry_index, lambda: self.get_expiring_items(days)).start()
+        return self.expiry_sweeper
+    
     def get_quick_use_items(self):
         """Get items that need to be used quickly after opening"""
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            
-            # Define items that need quick use after opening
-            quick_use_categories = {
-                'Dairy': 'Use within 3-5 days after opening',
-                'Meat': 'Use within 1-2 days after opening',
-                'Seafood': 'Use within 1 day after opening',
-                'Beverage': 'Best consumed within 3-7 days after opening',
-                'Condiments': 'Use within 30 days after opening',
-                'Produce': 'Best consumed within 2-3 days after cutting/opening'
-            }
-            
-            # Filter items based on categories that require quick use
-            quick_use_items = []
-            for _, item in df.iterrows():
-                category = str(item.get('category', '')).strip()
-                if category in quick_use_categories:
-                    item_dict = item.to_dict()
-                    item_dict['quick_use_note'] = quick_use_categories[category]
-                    quick_use_items.append(item_dict)
-            
-            return quick_use_items
+            return self._quick_use_from_frame(self.pantry_mirror.sync())
         except Exception as e:
             logging.error(f"Error getting quick use items: {e}")
             return []
     
+    def _quick_use_from_frame(self, df):
+        """Derive items that need quick use after opening from a frame of the pantry store"""
+        notes = df['category'].astype(str).str.strip().map(QUICK_USE_CATEGORIES)
+        has_note = notes.notna()
+        items = self.pantry_mirror.materialize(df[has_note])
+        for item, note in zip(items, notes[has_note].tolist()):
+            item['quick_use_note'] = note
+        return items
+    
     def get_user_allergens(self):
         """Get user's allergens"""
         try:
-            df = pd.read_excel(self.allergens_file, engine='openpyxl')
+            df = self.storage.read_table(self.allergens_table)
             return df.to_dict('records')
         except Exception as e:
             logging.error(f"Error reading allergens: {e}")
@@ -225,170 +322,175 @@ class PantryManager:
     def add_allergen(self, allergen, severity='medium'):
         """Add user allergen"""
         try:
-            df = pd.read_excel(self.allergens_file, engine='openpyxl')
             new_row = {
                 'allergen': allergen,
                 'severity': severity,
                 'date_added': datetime.now().strftime('%Y-%m-%d')
             }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df.to_excel(self.allergens_file, index=False, engine='openpyxl')
+            self.storage.append_rows(self.allergens_table, [new_row])
+            self._allergen_terms = None
             return True
         except Exception as e:
             logging.error(f"Error adding allergen: {e}")
             return False
     
+    def remove_allergen(self, allergen):
+        """Remove user allergen"""
+        try:
+            self.storage.delete_rows(self.allergens_table, 'allergen', allergen)
+            self._allergen_terms = None
+            return True
+        except Exception as e:
+            logging.error(f"Error removing allergen: {e}")
+            return False
+    
+    def get_allergen_terms(self):
+        """Get the user's allergens expanded to every variant term, cached until the profile changes"""
+        signature = self.storage.signature(self.allergens_table)
+        cached = self._allergen_terms
+        if cached is not None and signature is not None and cached[0] == signature:
+            return cached[1]
+        terms = expand_allergen_terms(
+            allergen_obj['allergen'] for allergen_obj in self.get_user_allergens()
+            if not pd.isna(allergen_obj['allergen'])
+        )
+        self._allergen_terms = (signature, terms)
+        return terms
+    
+    def get_allergen_items(self):
+        """Get pantry items that contain user allergens"""
+        try:
+            terms = self.get_allergen_terms()
+            if not terms:
+                return []
+            self.pantry_mirror.sync()
+            with self.pantry_mirror.lock:
+                frame = self.pantry_mirror.frame
+                labels = self.allergen_index.match(terms)
+            items = self.pantry_mirror.materialize(frame[frame.index.isin(labels)])
+            for item in items:
+                item['matched_allergens'] = item['allergens']
+            return items
+        except Exception as e:
+            logging.error(f"Error getting allergen items: {e}")
+            return []
+    
     def get_warranty_items(self):
         """Get warranty items"""
         try:
-            df = pd.read_excel(self.warranty_file, engine='openpyxl')
+            df = self.storage.read_table(self.warranty_table)
             return df.to_dict('records')
         except Exception as e:
             logging.error(f"Error reading warranty items: {e}")
             return []
     
-    def generate_restock_suggestions(self, order_history):
-        """Generate restocking suggestions based on order history"""
+    def generate_restock_suggestions(self, purchases, today=None, limit=5):
+        """Generate restocking suggestions from per-product purchase history, most urgent first"""
         try:
-            # Analyze order patterns and suggest restocking
-            suggestions = []
-            
-            # Simple logic - can be enhanced with ML
-            frequent_items = {}
-            for order in order_history:
-                for item in order.get('items', []):
-                    product_name = item.get('product_name', '')
-                    if product_name in frequent_items:
-                        frequent_items[product_name] += 1
-                    else:
-                        frequent_items[product_name] = 1
-            
-            # Get top 5 frequently ordered items
-            for item, count in sorted(frequent_items.items(), key=lambda x: x[1], reverse=True)[:5]:
-                suggestions.append({
-                    'product_name': item,
-                    'frequency': count,
-                    'suggestion': f'Consider restocking {item} (ordered {count} times)'
-                })
-            
-            return suggestions
+            return forecast_restock(purchases, self.pantry_mirror.sync(), today, limit)
         except Exception as e:
             logging.error(f"Error generating restock suggestions: {e}")
             return []
     
-    def get_nutrition_highlights(self):
+    def get_nutrition_highlights(self, limit=6):
         """Get nutrition-based product highlights and recommendations"""
         try:
-            products_df = pd.read_excel('products.xlsx', engine='openpyxl')
-            pantry_df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            
-            # Define nutrition categories and their benefits
-            nutrition_categories = {
-                'High Protein': {
-                    'keywords': ['protein'],
-                    'benefits': 'Essential for muscle building and repair',
-                    'recommendation': 'Great for post-workout recovery',
-                    'icon': 'fas fa-dumbbell',
-                    'color': 'success'
-                },
-                'Rich in Calcium': {
-                    'keywords': ['calcium'],
-                    'benefits': 'Supports strong bones and teeth',
-                    'recommendation': 'Important for growing children and seniors',
-                    'icon': 'fas fa-bone',
-                    'color': 'primary'
-                },
-                'High Fiber': {
-                    'keywords': ['fiber'],
-                    'benefits': 'Aids digestion and heart health',
-                    'recommendation': 'Helps maintain healthy weight',
-                    'icon': 'fas fa-leaf',
-                    'color': 'warning'
-                },
-                'Vitamin Rich': {
-                    'keywords': ['vitamin'],
-                    'benefits': 'Boosts immune system and energy',
-                    'recommendation': 'Essential for daily wellness',
-                    'icon': 'fas fa-shield-virus',
-                    'color': 'info'
-                },
-                'Iron Source': {
-                    'keywords': ['iron'],
-                    'benefits': 'Prevents anemia and boosts energy',
-                    'recommendation': 'Especially important for women',
-                    'icon': 'fas fa-battery-full',
-                    'color': 'danger'
-                }
-            }
+            self.pantry_mirror.sync()
+            with self.pantry_mirror.lock:
+                frame = self.pantry_mirror.frame
+                highlights = self.nutrition_index.highlights(limit)
+            items = self.pantry_mirror.materialize(
+                frame.loc[[label for label, _ in highlights]], ['product_name', 'photo', 'description']
+            )
             
             nutrition_highlights = []
-            
-            # Analyze pantry items for nutrition content
-            for _, item in pantry_df.iterrows():
-                item_dict = item.to_dict()
-                
-                # Check nutrition fields (nutrition_a, nutrition_b, nutrition_c)
-                nutrition_text = ''
-                for field in ['nutrition_a', 'nutrition_b', 'nutrition_c']:
-                    if pd.notna(item.get(field)) and str(item.get(field)).strip():
-                        nutrition_text += str(item.get(field)).lower() + ' '
-                
-                if nutrition_text:
-                    for category, info in nutrition_categories.items():
-                        for keyword in info['keywords']:
-                            if keyword in nutrition_text:
-                                highlight = {
-                                    'product_name': item_dict.get('product_name', ''),
-                                    'category': category,
-                                    'benefits': info['benefits'],
-                                    'recommendation': info['recommendation'],
-                                    'icon': info['icon'],
-                                    'color': info['color'],
-                                    'nutrition_details': nutrition_text.strip(),
-                                    'photo': item_dict.get('photo', ''),
-                                    'description': item_dict.get('description', ''),
-                                    'missing_nutrients': self._get_missing_nutrients(category, nutrition_text.strip())
-                                }
-                                nutrition_highlights.append(highlight)
-                                break  # Only add one category per item
-                        if len([h for h in nutrition_highlights if h['product_name'] == item_dict.get('product_name', '')]) > 0:
-                            break  # Move to next item if already added
-            
-            # Limit to top 6 items to avoid overwhelming the user
-            return nutrition_highlights[:6]
-            
+            for item, (_, tag) in zip(items, highlights):
+                info = NUTRITION_CATEGORIES[tag['category']]
+                nutrition_highlights.append({
+                    'product_name': item.get('product_name', ''),
+                    'category': tag['category'],
+                    'benefits': info['benefits'],
+                    'recommendation': info['recommendation'],
+                    'icon': info['icon'],
+                    'color': info['color'],
+                    'nutrition_details': tag['text'],
+                    'photo': item.get('photo', ''),
+                    'description': item.get('description', ''),
+                    'missing_nutrients': tag['missing_nutrients']
+                })
+            return nutrition_highlights
         except Exception as e:
             logging.error(f"Error getting nutrition highlights: {e}")
             return []
     
+    def get_nutrition_totals(self):
+        """Get every nutrient summed across the pantry weighted by quantity, largest amounts first within a unit"""
+        try:
+            self.pantry_mirror.sync()
+            with self.pantry_mirror.lock:
+                totals = self.nutrition_index.totals()
+            return [
+                {'nutrient': name.title(), 'amount': round(amount, 6), 'unit': unit, 'items': items}
+                for (name, unit), (amount, items) in sorted(totals.items(), key=lambda total: (total[0][1], -total[1][0]))
+            ]
+        except Exception as e:
+            logging.error(f"Error getting nutrition totals: {e}")
+            return []
+    
+    def build_dashboard(self, load_orders, load_purchases, days=7):
+        """Build every pantry dashboard panel, loading the independent sources in parallel first
+        
+        load_orders and load_purchases are zero-argument callables, so the
+        order data loads alongside the pantry, allergen and warranty tables.
+        """
+        today = datetime.now()
+        sources = load_parallel({
+            'orders': load_orders,
+            'purchases': load_purchases,
+            'pantry': self.pantry_mirror.sync,
+            'allergens': lambda: self._read_frame(self.allergens_table),
+            'warranty': lambda: self._read_frame(self.warranty_table)
+        })
+        pantry_df = sources['pantry']
+        allergens_df = sources['allergens']
+        warranty_df = sources['warranty']
+        purchases = sources['purchases'] or {}
+        
+        return {
+            'pantry_items': self._panel('pantry items', lambda: self.pantry_mirror.records()),
+            'expiring_items': self._panel('expiring items', lambda: self.get_expiring_items(days)),
+            'quick_use_items': self._panel('quick use items', lambda: self._quick_use_from_frame(pantry_df)),
+            'user_allergens': self._panel('allergens', lambda: allergens_df.to_dict('records')),
+            'warranty_items': self._panel('warranty items', lambda: warranty_df.to_dict('records')),
+            'restock_suggestions': self._panel('restock suggestions', lambda: forecast_restock(purchases, pantry_df, today)),
+            'nutrition_highlights': self._panel('nutrition highlights', self.get_nutrition_highlights),
+            'orders': sources['orders'] or []
+        }
+    
+    def _read_frame(self, table):
+        """Read a table for the dashboard, falling back to an empty frame"""
+        try:
+            return self.storage.read_table(table)
+        except Exception as e:
+            logging.error(f"Error reading {table}: {e}")
+            return pd.DataFrame()
+    
+    def _panel(self, name, build):
+        """Build one dashboard panel, logging and emptying it on failure"""
+        try:
+            return build()
+        except Exception as e:
+            logging.error(f"Error building {name} panel: {e}")
+            return []
+    
     def add_order_items_to_pantry(self, order_items):
         """Add ordered items to pantry automatically"""
         try:
-            from datetime import datetime, timedelta
-            
+            pantry_items = []
             for item in order_items:
-                # Calculate expiry date based on product type
+                # Determine category, default expiry and storage from the product name
                 product_name = item.get('product_name', '')
-                category = 'Grocery'  # Default category
-                
-                # Determine category and default expiry
-                if any(keyword in product_name.lower() for keyword in ['milk', 'dairy', 'cheese', 'yogurt']):
-                    category = 'Dairy'
-                    expiry_days = 7
-                elif any(keyword in product_name.lower() for keyword in ['bread', 'bakery']):
-                    category = 'Bakery'
-                    expiry_days = 5
-                elif any(keyword in product_name.lower() for keyword in ['meat', 'chicken', 'beef']):
-                    category = 'Meat'
-                    expiry_days = 3
-                elif any(keyword in product_name.lower() for keyword in ['fruit', 'apple', 'banana']):
-                    category = 'Fruit'
-                    expiry_days = 7
-                elif any(keyword in product_name.lower() for keyword in ['vegetable', 'carrot', 'lettuce']):
-                    category = 'Vegetable'
-                    expiry_days = 5
-                else:
-                    expiry_days = 30  # Default for non-perishables
+                category, expiry_days, storage_tag = categorizer.categorize(product_name)
                 
                 # Create pantry item data
                 pantry_item = {
@@ -397,11 +499,11 @@ class PantryManager:
                     'photo': item.get('image', ''),
                     'price': item.get('price', 0),
                     'category': category,
-                    'storage_tags': self._get_storage_tag(category),
+                    'storage_tags': storage_tag,
                     'expiry_date': (datetime.now() + timedelta(days=expiry_days)).strftime('%Y-%m-%d'),
                     'quantity': item.get('quantity', 1),
                     'unit': 'pcs',
-                    'description': f"Added from order",
+                    'description': "Added from order",
                     'nutrition_a': '',
                     'nutrition_b': '',
                     'nutrition_c': '',
@@ -413,9 +515,9 @@ class PantryManager:
                     'restock_days': expiry_days
                 }
                 
-                self.add_pantry_item(pantry_item)
-                
-            return True
+                pantry_items.append(pantry_item)
+            
+            return self.add_pantry_items(pantry_items)
         except Exception as e:
             logging.error(f"Error adding order items to pantry: {e}")
             return False
@@ -423,71 +525,14 @@ class PantryManager:
     def remove_pantry_item(self, product_name):
         """Remove item from pantry"""
         try:
-            df = pd.read_excel(self.pantry_file, engine='openpyxl')
-            
-            # Find the item to remove
-            item_index = df[df['product_name'] == product_name].index
-            
-            if len(item_index) == 0:
-                return False  # Item not found
-            
             # Remove the item (remove first occurrence if multiple exist)
-            df = df.drop(item_index[0])
+            removed = self.storage.delete_rows(self.pantry_table, 'product_name', product_name, limit=1)
             
-            # Save back to file
-            df.to_excel(self.pantry_file, index=False, engine='openpyxl')
+            if removed == 0:
+                return False  # Item not found
             
             return True
             
         except Exception as e:
             logging.error(f"Error removing pantry item: {e}")
             return False
-    
-    def _get_storage_tag(self, category):
-        """Get appropriate storage tag based on category"""
-        storage_map = {
-            'Dairy': 'Refrigerator',
-            'Meat': 'Freezer',
-            'Fruit': 'Counter',
-            'Vegetable': 'Refrigerator',
-            'Bakery': 'Pantry',
-            'Electronics': 'Shelf'
-        }
-        return storage_map.get(category, 'Pantry')
-    
-    def _get_missing_nutrients(self, category, nutrition_text):
-        """Get missing nutrients based on nutrition category"""
-        missing_nutrients_map = {
-            'High Protein': {
-                'beneficial': ['iron', 'b12', 'zinc', 'vitamin b6']
-            },
-            'Rich in Calcium': {
-                'beneficial': ['magnesium', 'phosphorus', 'vitamin d', 'vitamin k']
-            },
-            'High Fiber': {
-                'beneficial': ['prebiotics', 'potassium', 'magnesium', 'vitamin c']
-            },
-            'Vitamin Rich': {
-                'beneficial': ['antioxidants', 'beta carotene', 'folate', 'omega-3']
-            },
-            'Iron Source': {
-                'beneficial': ['vitamin c', 'b12', 'folate', 'copper']
-            }
-        }
-        
-        if category not in missing_nutrients_map:
-            return ''
-        
-        category_nutrients = missing_nutrients_map[category]
-        missing = []
-        
-        # Check for missing beneficial nutrients
-        for nutrient in category_nutrients['beneficial']:
-            if nutrient not in nutrition_text.lower():
-                missing.append(nutrient.title())
-        
-        # Limit to 3 missing nutrients to keep display clean
-        if missing:
-            return ', '.join(missing[:3])
-        
-        return ''
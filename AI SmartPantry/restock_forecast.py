@@ -0,0 +1,160 @@
+from datetime import datetime
+
+import pandas as pd
+
+# Urgency of a restock by the days left before a product is projected to run out
+RESTOCK_URGENCY = [(0, 'overdue'), (3, 'soon'), (7, 'upcoming')]
+RESTOCK_LATER = 'later'
+
+
+class PurchaseHistory:
+    """Per-product purchase statistics kept current as order lines are appended
+
+    For each product it tracks the number of orders it was bought in, the
+    first and last order dates, the total quantity bought and the quantity of
+    the last purchase. That is enough to derive the mean inter-purchase
+    interval and the consumption rate without revisiting old order lines.
+    Each batch of lines is summarised with one groupby and merged per product.
+    It is an index on the OrderArchive of the orders table. Removed lines can't
+    be backed out of the totals, so a removal triggers a rebuild from the
+    archive on the next read.
+    """
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+        self.products = {}
+        self.stale = False
+        mirror.add_index(self)
+
+    def clear(self):
+        """Drop every product"""
+        self.products = {}
+        self.stale = False
+
+    def add(self, frame):
+        """Fold a batch of order lines into the per-product statistics"""
+        if frame.empty or 'product_name' not in frame.columns:
+            return
+        lines = pd.DataFrame({
+            'product_name': frame['product_name'],
+            'order_id': frame['order_id'],
+            'quantity': pd.to_numeric(frame['quantity'], errors='coerce').fillna(0),
+            'order_date': pd.to_datetime(frame['order_date'], errors='coerce', format='mixed')
+        }).dropna(subset=['product_name', 'order_date'])
+        if lines.empty:
+            return
+        purchases = (
+            lines.groupby(['product_name', 'order_id'], sort=False)
+            .agg(quantity=('quantity', 'sum'), order_date=('order_date', 'min'))
+            .reset_index()
+            .sort_values('order_date', kind='stable')
+        )
+        grouped = purchases.groupby('product_name', sort=False)
+        summary = grouped.agg(
+            purchases=('order_id', 'size'),
+            first=('order_date', 'min'),
+            last=('order_date', 'max'),
+            quantity=('quantity', 'sum'),
+            last_quantity=('quantity', 'last')
+        )
+        for product_name, purchase_count, first, last, quantity, last_quantity in zip(
+            summary.index, summary['purchases'], summary['first'], summary['last'],
+            summary['quantity'], summary['last_quantity']
+        ):
+            stats = self.products.get(product_name)
+            if stats is None:
+                self.products[product_name] = {
+                    'purchases': int(purchase_count),
+                    'first': first,
+                    'last': last,
+                    'quantity': float(quantity),
+                    'last_quantity': float(last_quantity)
+                }
+                continue
+            stats['purchases'] += int(purchase_count)
+            stats['quantity'] += float(quantity)
+            stats['first'] = min(stats['first'], first)
+            if last >= stats['last']:
+                stats['last'] = last
+                stats['last_quantity'] = float(last_quantity)
+
+    def remove(self, frame):
+        """Mark the statistics for a rebuild"""
+        self.stale = True
+
+    def snapshot(self):
+        """Get a copy of the per-product statistics, syncing with the orders table first"""
+        self.mirror.sync()
+        with self.mirror.lock:
+            if self.stale:
+                self.clear()
+                self.add(self.mirror.frame)
+            return {product_name: dict(stats) for product_name, stats in self.products.items()}
+
+
+def _urgency(days_left):
+    """Name the urgency of a restock due in days_left days"""
+    for limit, level in RESTOCK_URGENCY:
+        if days_left <= limit:
+            return level
+    return RESTOCK_LATER
+
+
+def forecast_restock(purchases, pantry_df, today=None, limit=5):
+    """Project when each purchased product runs out and rank restock suggestions by urgency
+
+    The consumption rate is the quantity bought before the last purchase
+    spread over the days between the first and last purchase. On-hand
+    quantity is summed from the pantry, so the run-out date is today plus
+    on-hand over rate. Products bought only once have no rate, so they fall
+    back to the pantry's restock_days counted from the last purchase.
+    Products with neither are left out.
+    """
+    today = pd.Timestamp(today or datetime.now())
+    on_hand = {}
+    restock_days = {}
+    if not pantry_df.empty and 'product_name' in pantry_df.columns:
+        pantry = pd.DataFrame({
+            'product_name': pantry_df['product_name'].astype(object),
+            'quantity': pd.to_numeric(pantry_df.get('quantity'), errors='coerce'),
+            'restock_days': pd.to_numeric(pantry_df.get('restock_days'), errors='coerce')
+        })
+        grouped = pantry.groupby('product_name', sort=False)
+        on_hand = grouped['quantity'].sum().to_dict()
+        restock_days = grouped['restock_days'].mean().dropna().to_dict()
+
+    suggestions = []
+    for product_name, stats in purchases.items():
+        span_days = (stats['last'] - stats['first']).total_seconds() / 86400
+        interval_days = span_days / (stats['purchases'] - 1) if stats['purchases'] > 1 and span_days > 0 else None
+        daily_rate = (stats['quantity'] - stats['last_quantity']) / span_days if interval_days else None
+        quantity = on_hand.get(product_name, 0) or 0
+        if daily_rate:
+            days_left = quantity / daily_rate
+        elif product_name in restock_days:
+            days_left = (stats['last'] + pd.Timedelta(days=restock_days[product_name]) - today).total_seconds() / 86400
+        else:
+            continue
+        run_out = today + pd.Timedelta(days=days_left)
+        if days_left <= 0:
+            suggestion = f"Restock {product_name} now (projected to have run out)"
+        else:
+            suggestion = f"Restock {product_name} within {int(days_left)} days"
+        if interval_days and interval_days >= 1:
+            suggestion += f", usually bought every {interval_days:.0f} days"
+        elif interval_days:
+            suggestion += ", usually bought more than once a day"
+        suggestions.append({
+            'product_name': product_name,
+            'frequency': stats['purchases'],
+            'on_hand': quantity,
+            'daily_rate': round(daily_rate, 3) if daily_rate else None,
+            'interval_days': round(interval_days, 1) if interval_days else None,
+            'days_left': round(days_left, 1),
+            'run_out_date': run_out.strftime('%Y-%m-%d'),
+            'urgency': _urgency(days_left),
+            'suggestion': suggestion
+        })
+
+    suggestions.sort(key=lambda suggestion: (suggestion['days_left'], -suggestion['frequency']))
+    return suggestions[:limit]
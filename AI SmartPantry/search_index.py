@@ -0,0 +1,230 @@
+import re
+import heapq
+from functools import lru_cache
+
+# Searchable pantry columns and how much a match in each one counts
+SEARCH_FIELDS = {
+    'product_name': 4.0,
+    'category': 2.0,
+    'storage_tags': 1.5,
+    'description': 1.0
+}
+
+# How well a query term fits a token: the whole token, its start, or somewhere inside
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+INFIX_MATCH = 0.3
+
+# Length of the character n-grams used to find infix matches
+NGRAM_SIZE = 3
+
+# Recent queries whose matches are kept until the next add or remove, since
+# search-as-you-type and paging repeat the same query
+RESULT_CACHE_SIZE = 64
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+@lru_cache(maxsize=8192)
+def tokenize(text):
+    """Split text into lowercase alphanumeric tokens"""
+    return tuple(TOKEN_PATTERN.findall(str(text).lower()))
+
+
+def _ngrams(token):
+    """Get the distinct n-grams of a token"""
+    return {token[i:i + NGRAM_SIZE] for i in range(len(token) - NGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Inverted index over the searchable pantry columns with prefix and n-gram lookup
+
+    Each distinct token maps field weight to the set of row labels whose best
+    field for that token has that weight. A prefix map finds the tokens a
+    query term starts, and a trigram map finds candidates for terms inside a
+    token, so "ilk" still finds "milk" as the old substring scan did. Terms
+    shorter than an n-gram have no n-gram to look up, so they scan the
+    token vocabulary instead.
+
+    Every term of a query must match for a row to be returned. A row scores
+    the sum over terms of field weight times match quality, and ties keep
+    pantry order. Because there are only a handful of distinct scores, rows
+    are grouped by score with set operations and only the requested page is
+    ever sorted.
+    """
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = fields
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed row"""
+        self.results = {}
+        self.postings = {}
+        self.row_tokens = {}
+        self.prefixes = {}
+        self.ngrams = {}
+
+    def add(self, frame):
+        """Index rows"""
+        self.results = {}
+        for field, weight in self.fields.items():
+            if field not in frame.columns:
+                continue
+            values = frame[field]
+            values = values[values.notna()]
+            if len(values) == 1:
+                groups = {str(values.iloc[0]): values.index}
+            else:
+                groups = values.groupby(values.astype(str), sort=False).groups
+            for text, labels in groups.items():
+                for token in tokenize(text):
+                    self._post(token, weight, labels)
+
+    def _post(self, token, weight, labels):
+        """Record that rows contain a token in a field of the given weight"""
+        posting = self.postings.get(token)
+        if posting is None:
+            posting = self.postings[token] = {}
+            self._add_token(token)
+        for label in labels:
+            tokens = self.row_tokens.setdefault(label, {})
+            current = tokens.get(token)
+            if current is None or current < weight:
+                if current is not None:
+                    posting[current].discard(label)
+                posting.setdefault(weight, set()).add(label)
+                tokens[token] = weight
+
+    def remove(self, frame):
+        """Unindex rows"""
+        self.results = {}
+        for label in frame.index:
+            for token, weight in self.row_tokens.pop(label, {}).items():
+                posting = self.postings.get(token)
+                if posting is None:
+                    continue
+                posting[weight].discard(label)
+                if not posting[weight]:
+                    del posting[weight]
+                if not posting:
+                    del self.postings[token]
+                    self._remove_token(token)
+
+    def _add_token(self, token):
+        """Register a new token in the prefix and n-gram maps"""
+        for end in range(1, len(token) + 1):
+            self.prefixes.setdefault(token[:end], set()).add(token)
+        for gram in _ngrams(token):
+            self.ngrams.setdefault(gram, set()).add(token)
+
+    def _remove_token(self, token):
+        """Drop a token that no longer appears in any row from the prefix and n-gram maps"""
+        for end in range(1, len(token) + 1):
+            tokens = self.prefixes.get(token[:end])
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.prefixes[token[:end]]
+        for gram in _ngrams(token):
+            tokens = self.ngrams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.ngrams[gram]
+
+    def _term_matches(self, term):
+        """Get each token a query term matches with its match quality"""
+        matches = {token: PREFIX_MATCH for token in self.prefixes.get(term, ())}
+        if term in self.postings:
+            matches[term] = EXACT_MATCH
+        if len(term) >= NGRAM_SIZE:
+            candidates = None
+            for gram in _ngrams(term):
+                tokens = self.ngrams.get(gram)
+                if not tokens:
+                    return matches
+                candidates = set(tokens) if candidates is None else candidates & tokens
+            for token in candidates:
+                if token not in matches and term in token:
+                    matches[token] = INFIX_MATCH
+        else:
+            for token in self.postings:
+                if token not in matches and term in token:
+                    matches[token] = INFIX_MATCH
+        return matches
+
+    def _term_groups(self, term):
+        """Get {score: labels} for the rows a term matches, each row under its best score"""
+        by_score = {}
+        for token, quality in self._term_matches(term).items():
+            for weight, labels in self.postings[token].items():
+                by_score.setdefault(weight * quality, []).append(labels)
+        # Posting sets are shared with the index, so they are only ever read here
+        groups = {}
+        seen = None
+        for score in sorted(by_score, reverse=True):
+            sets = by_score[score]
+            labels = sets[0] if len(sets) == 1 else set().union(*sets)
+            if seen:
+                labels = labels - seen
+            if labels:
+                groups[score] = labels
+                seen = labels if seen is None else seen | labels
+        return groups
+
+    def search(self, query, limit=None, offset=0):
+        """Get (labels, total) for the rows matching every term of query, best first"""
+        terms = tokenize(query)
+        if not terms:
+            return [], 0
+        cached = self.results.get(terms)
+        if cached is None:
+            groups = self._match(terms)
+            if len(self.results) >= RESULT_CACHE_SIZE:
+                self.results.pop(next(iter(self.results)))
+            self.results[terms] = groups
+            return self._page(groups, limit, offset)
+        if isinstance(cached, dict):
+            # Asked again, so rank every match once and serve later pages by slicing
+            cached = self._page(cached, None, 0)
+            self.results[terms] = cached
+        ranked, total = cached
+        return ranked[offset:None if limit is None else offset + limit], total
+
+    def _match(self, terms):
+        """Get {score: labels} for the rows matching every term"""
+        groups = None
+        for term in dict.fromkeys(terms):
+            term_groups = self._term_groups(term)
+            if groups is None:
+                groups = term_groups
+                continue
+            combined = {}
+            for score, labels in groups.items():
+                for term_score, term_labels in term_groups.items():
+                    both = labels & term_labels
+                    if both:
+                        combined.setdefault(score + term_score, set()).update(both)
+            groups = combined
+            if not groups:
+                break
+        return groups
+
+    def _page(self, groups, limit, offset):
+        """Get (labels, total) for one page of score groups, sorting only what the page needs"""
+        total = sum(len(labels) for labels in groups.values())
+        end = total if limit is None else min(total, offset + limit)
+        ranked = []
+        position = 0
+        for score in sorted(groups, reverse=True):
+            labels = groups[score]
+            if position + len(labels) > offset and position < end:
+                start = max(offset - position, 0)
+                stop = min(end - position, len(labels))
+                page = sorted(labels) if stop == len(labels) else heapq.nsmallest(stop, labels)
+                ranked.extend(page[start:stop])
+            position += len(labels)
+            if position >= end:
+                break
+        return ranked, total
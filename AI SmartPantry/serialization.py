@@ -0,0 +1,106 @@
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+# What a missing pantry cell becomes in API responses; other columns become ''
+COLUMN_DEFAULTS = {
+    'price': 0,
+    'quantity': 0,
+    'restock_days': 0,
+    'barcode': None
+}
+MISSING_TEXT = ''
+
+
+def _missing_mask(values):
+    """Find cells that are NaN/None or the literal string 'nan' left behind by a workbook round trip"""
+    missing = values.isna()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        if categories.dtype == object or pd.api.types.is_string_dtype(categories.dtype):
+            missing |= values.isin(categories[categories.astype(str).str.lower() == 'nan'])
+    elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+        missing |= values.astype(str).str.lower() == 'nan'
+    return missing
+
+
+def fill_defaults(df):
+    """Replace missing cells with each column's default, a column at a time"""
+    filled = {}
+    for column in df.columns:
+        missing = _missing_mask(df[column])
+        if missing.any():
+            filled[column] = df[column].astype(object).where(~missing, COLUMN_DEFAULTS.get(column, MISSING_TEXT))
+    return df.assign(**filled) if filled else df
+
+
+def _default(value):
+    """Encode the numpy and pandas values that reach a response"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _scrub(value):
+    """Replace NaN floats, which are not valid JSON, with null"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _scrub(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_scrub(item) for item in value]
+    return value
+
+
+# Keyword arguments whose json.dumps output orjson already gives
+ORJSON_COMPATIBLE = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def _orjson_compatible(kwargs):
+    """Check that orjson's output is what json.dumps would give with these keyword arguments"""
+    return all(key in ORJSON_COMPATIBLE and ORJSON_COMPATIBLE[key] == argument for key, argument in kwargs.items())
+
+
+def dumps(value, sort_keys=False, **kwargs):
+    """Encode a value as JSON text, with orjson when it is installed and can honour the other arguments
+
+    Other keyword arguments are passed on to json.dumps, so callers such as
+    Flask's session serializer still get the separators or indent they ask for.
+    """
+    if orjson is not None and _orjson_compatible(kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, default=_default, option=option).decode()
+    kwargs.setdefault('default', _default)
+    try:
+        return json.dumps(value, sort_keys=sort_keys, **{**kwargs, 'allow_nan': False})
+    except ValueError:
+        # Only payloads that still hold a NaN pay for the walk
+        return json.dumps(_scrub(value), sort_keys=sort_keys, **kwargs)
+
+
+class PantryJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that makes every jsonify response NaN-safe and fast"""
+
+    # orjson always writes UTF-8, so write it the same way without orjson
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        return dumps(obj, sort_keys=kwargs.pop('sort_keys', self.sort_keys), **kwargs)
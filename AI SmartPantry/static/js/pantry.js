@@ -501,70 +501,8 @@ function showAllPantryProducts() {
     if (container) {
         container.innerHTML = '<div class="text-center"><h4>Loading pantry items...</h4><div class="spinner-border" role="status"></div></div>';
         
-        // Load data
-        fetch('/pantry/all_items')
-            .then(response => {
-                if (!response.ok) {
-                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-                }
-                return response.json();
-            })
-            .then(data => {
-                console.log('Received clean data:', data);
-                
-                if (data.items && data.items.length > 0) {
-                    let html = '<div class="table-responsive"><table class="table table-striped table-hover"><thead class="table-dark"><tr>';
-                    html += '<th>Product</th><th>Category</th><th>Quantity</th><th>Expiry Date</th><th>Storage</th><th>Actions</th>';
-                    html += '</tr></thead><tbody>';
-                    
-                    data.items.forEach((item, index) => {
-                        const name = item.product_name || 'Unknown Product';
-                        const category = item.category || 'N/A';
-                        const quantity = (item.quantity || 0) + ' ' + (item.unit || 'pcs');
-                        const expiry = item.expiry_date || 'N/A';
-                        const storage = item.storage_tags || 'N/A';
-                        
-                        // Calculate days to expiry for color coding
-                        let expiryClass = '';
-                        if (expiry !== 'N/A') {
-                            const expiryDate = new Date(expiry);
-                            const today = new Date();
-                            const daysToExpiry = Math.ceil((expiryDate - today) / (1000 * 60 * 60 * 24));
-                            
-                            if (daysToExpiry <= 3) expiryClass = 'text-danger fw-bold';
-                            else if (daysToExpiry <= 7) expiryClass = 'text-warning fw-bold';
-                        }
-                        
-                        html += `<tr id="pantry-row-${index}">
-                            <td><strong>${name}</strong></td>
-                            <td><span class="badge bg-secondary">${category}</span></td>
-                            <td>${quantity}</td>
-                            <td class="${expiryClass}">${expiry}</td>
-                            <td><span class="badge bg-info">${storage}</span></td>
-                            <td>
-                                <button class="btn btn-sm btn-outline-danger" 
-                                        onclick="removePantryItem('${name}', ${index})" 
-                                        title="Remove from pantry">
-                                    <i class="fas fa-trash"></i> Remove
-                                </button>
-                            </td>
-                        </tr>`;
-                    });
-                    
-                    html += '</tbody></table></div>';
-                    container.innerHTML = html;
-                } else {
-                    container.innerHTML = '<div class="text-center"><h5>No pantry items found</h5><p class="text-muted">Start adding items to your pantry!</p></div>';
-                }
-            })
-            .catch(error => {
-                console.error('Error loading pantry items:', error);
-                container.innerHTML = `<div class="alert alert-danger">
-                    <h5>Error loading items</h5>
-                    <p>${error.message}</p>
-                    <button class="btn btn-outline-danger" onclick="showAllPantryProducts()">Retry</button>
-                </div>`;
-            });
+        // Load the first page; later pages load as the user scrolls
+        loadPantryPage(container, null, 0);
     }
     
     // Close button functionality
@@ -593,6 +531,102 @@ function showAllPantryProducts() {
     }
 }
 
+// Pantry items fetched per page of the all-items view
+const PANTRY_PAGE_SIZE = 50;
+const PANTRY_PAGE_FIELDS = 'product_name,description,category,quantity,unit,expiry_date,storage_tags,price';
+
+// Load one page of pantry items into the all-items table and watch for the next one
+function loadPantryPage(container, cursor, startIndex) {
+    let url = `/pantry/all_items?limit=${PANTRY_PAGE_SIZE}&fields=${PANTRY_PAGE_FIELDS}`;
+    if (cursor) {
+        url += `&cursor=${encodeURIComponent(cursor)}`;
+    }
+    
+    fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            const items = data.items || [];
+            
+            if (!cursor) {
+                if (items.length === 0) {
+                    container.innerHTML = '<div class="text-center"><h5>No pantry items found</h5><p class="text-muted">Start adding items to your pantry!</p></div>';
+                    return;
+                }
+                let html = '<div class="table-responsive"><table class="table table-striped table-hover"><thead class="table-dark"><tr>';
+                html += '<th>Product</th><th>Category</th><th>Quantity</th><th>Expiry Date</th><th>Storage</th><th>Actions</th>';
+                html += '</tr></thead><tbody id="allPantryRows"></tbody></table></div>';
+                html += '<div id="allPantrySentinel" class="text-center py-2"></div>';
+                container.innerHTML = html;
+            }
+            
+            const tbody = document.getElementById('allPantryRows');
+            tbody.insertAdjacentHTML('beforeend', items.map((item, offset) => pantryRowHtml(item, startIndex + offset)).join(''));
+            
+            const sentinel = document.getElementById('allPantrySentinel');
+            if (data.next_cursor) {
+                sentinel.innerHTML = '<div class="spinner-border spinner-border-sm" role="status"></div>';
+                // Fetch the next page once the bottom of the table scrolls into view
+                const observer = new IntersectionObserver(entries => {
+                    if (entries.some(entry => entry.isIntersecting)) {
+                        observer.disconnect();
+                        loadPantryPage(container, data.next_cursor, startIndex + items.length);
+                    }
+                });
+                observer.observe(sentinel);
+            } else {
+                sentinel.innerHTML = '';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading pantry items:', error);
+            container.innerHTML = `<div class="alert alert-danger">
+                <h5>Error loading items</h5>
+                <p>${error.message}</p>
+                <button class="btn btn-outline-danger" onclick="showAllPantryProducts()">Retry</button>
+            </div>`;
+        });
+}
+
+// Build one row of the all-items table
+function pantryRowHtml(item, index) {
+    const name = item.product_name || 'Unknown Product';
+    const category = item.category || 'N/A';
+    const quantity = (item.quantity || 0) + ' ' + (item.unit || 'pcs');
+    const expiry = item.expiry_date || 'N/A';
+    const storage = item.storage_tags || 'N/A';
+    
+    // Calculate days to expiry for color coding
+    let expiryClass = '';
+    if (expiry !== 'N/A') {
+        const expiryDate = new Date(expiry);
+        const today = new Date();
+        const daysToExpiry = Math.ceil((expiryDate - today) / (1000 * 60 * 60 * 24));
+        
+        if (daysToExpiry <= 3) expiryClass = 'text-danger fw-bold';
+        else if (daysToExpiry <= 7) expiryClass = 'text-warning fw-bold';
+    }
+    
+    return `<tr id="pantry-row-${index}">
+        <td><strong>${name}</strong></td>
+        <td><span class="badge bg-secondary">${category}</span></td>
+        <td>${quantity}</td>
+        <td class="${expiryClass}">${expiry}</td>
+        <td><span class="badge bg-info">${storage}</span></td>
+        <td>
+            <button class="btn btn-sm btn-outline-danger" 
+                    onclick="removePantryItem('${name}', ${index})" 
+                    title="Remove from pantry">
+                <i class="fas fa-trash"></i> Remove
+            </button>
+        </td>
+    </tr>`;
+}
+
 function displayAllPantryItems(items) {
     const container = document.getElementById('allPantryContent');
     console.log('Displaying items:', items);
@@ -0,0 +1,658 @@
+import os
+import json
+import itertools
+import math
+import pickle
+import sqlite3
+import logging
+import threading
+import openpyxl
+import pandas as pd
+from pandas.io.parsers import TextParser
+from table_cache import table_cache
+from instrumentation import instrument
+from loader_pool import read_workbook
+from write_coordinator import atomic_write, file_lock, write_coordinator
+
+EXCEL_BACKEND = 'excel'
+SQLITE_BACKEND = 'sqlite'
+
+# Logical tables managed by DataManager and PantryManager. Each one maps to
+# <table>.xlsx on the Excel backend and to a table of the same name in SQLite.
+TABLES = ['products', 'orders', 'pantry_items', 'user_allergens', 'warranty_items']
+
+# Append-only tables whose new rows go to a JSON Lines journal on the Excel backend
+JOURNALED_TABLES = ['orders']
+
+# Storage methods timed as I/O in the request and method metrics
+TIMED_METHODS = ['exists', 'signature', 'read_table', 'write_table', 'append_rows', 'append_stream', 'delete_rows',
+                 'compact', 'next_id']
+
+# Rows of a streamed append passed to listeners as deltas; a larger one tells them to reload instead
+STREAM_DELTA_ROWS = 10_000
+
+# Bump when the snapshot layout changes so old sidecars are ignored
+SNAPSHOT_VERSION = 2
+
+# Columns indexed on the SQLite backend for the lookups the managers perform
+TABLE_INDEXES = {
+    'products': ['id'],
+    'orders': ['order_id'],
+    'pantry_items': ['product_name', 'storage_tags', 'expiry_date'],
+    'user_allergens': ['allergen'],
+    'warranty_items': ['product_name']
+}
+
+
+def file_signature(path, *extra_paths):
+    """Get an (mtime, size) signature for a file and its companions, or None if it is missing"""
+    signature = []
+    for candidate in (path,) + extra_paths:
+        try:
+            stat = os.stat(candidate)
+        except FileNotFoundError:
+            if candidate == path:
+                return None
+            signature.append(None)
+            continue
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def as_read_back(df):
+    """Convert a frame to what parsing it back out of a workbook would give
+
+    read_excel hands the cell values to pandas' TextParser, so running the
+    same parser over the values reproduces its NaN handling and type
+    inference without writing and reparsing a workbook. A cell can't tell
+    1.0 from 1, so whole floats come back as ints, as read_excel gives them.
+    to_excel writes no cell for a missing value or an empty string, so
+    trailing rows made only of those never reach the workbook and are
+    dropped here too.
+    """
+    rows = [
+        [int(value) if isinstance(value, float) and value.is_integer() else value for value in row]
+        for row in df.astype(object).where(df.notna(), None).values.tolist()
+    ]
+    while rows and all(value is None or (isinstance(value, str) and value == '') for value in rows[-1]):
+        rows.pop()
+    return TextParser([list(df.columns)] + rows, header=0).read()
+
+
+class _ChangeFeed:
+    """Lets in-memory indexes follow the writes made through a storage backend
+
+    Listeners are called as listener(table, before, after, changes) once a write
+    has landed, where before and after are the table signatures around the write
+    and changes is the list of ('append', rows), ('delete', column, value, limit)
+    or ('replace', df) entries it applied, or [('reload',)] when there were too
+    many rows to pass along. An empty list means the contents did not change,
+    e.g. a compaction. A listener whose view matches before can apply the
+    changes and move to after; otherwise it has missed a write and should
+    reload the table. Appended rows are passed as they were written, and
+    read_back turns them into what a read of the table would give.
+    """
+
+    def subscribe(self, table, listener):
+        """Register a listener for the writes made to a table"""
+        self._listeners.setdefault(table, []).append(listener)
+
+    def read_back(self, table, df):
+        """Convert a frame of appended rows to what reading them back from the table would give"""
+        return df
+
+    def _stream_changes(self, chunks, state):
+        """Pass chunks of row dicts through, counting the rows and keeping them as deltas while they are few"""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            state['count'] += len(chunk)
+            if state['changes'] is not None:
+                state['changes'].append(('append', chunk))
+                if state['count'] > STREAM_DELTA_ROWS:
+                    state['changes'] = None
+            yield chunk
+
+    def _notify(self, table, before, after, changes):
+        """Tell a table's listeners about a write"""
+        for listener in self._listeners.get(table, []):
+            try:
+                listener(table, before, after, changes)
+            except Exception as e:
+                logging.error(f"Error notifying {table} listener: {e}")
+
+
+@instrument('io', TIMED_METHODS)
+class ExcelStorage(_ChangeFeed):
+    """Storage backend that keeps every table in its own .xlsx workbook"""
+
+    backend = EXCEL_BACKEND
+
+    def __init__(self, directory='.', journaled_tables=JOURNALED_TABLES, compact_threshold=500):
+        self._listeners = {}
+        self.directory = directory
+        self.journaled_tables = set(journaled_tables)
+        self.compact_threshold = compact_threshold
+
+    def path_for(self, table):
+        """Get the workbook path for a table"""
+        return os.path.join(self.directory, f'{table}.xlsx')
+
+    def journal_path(self, table):
+        """Get the JSON Lines journal path for an append-only table"""
+        return os.path.join(self.directory, f'{table}.journal.jsonl')
+
+    def snapshot_path(self, path):
+        """Get the binary snapshot sidecar path for a workbook"""
+        return f'{os.path.splitext(path)[0]}.snapshot.pkl'
+
+    def exists(self, table):
+        """Check whether a table has been created"""
+        return os.path.exists(self.path_for(table))
+
+    def signature(self, table):
+        """Get the signature that changes whenever the table's workbook or journal changes"""
+        if table in self.journaled_tables:
+            return file_signature(self.path_for(table), self.journal_path(table))
+        return file_signature(self.path_for(table))
+
+    def read_back(self, table, df):
+        """Convert a frame of appended rows to what reading them back from the table would give"""
+        # Journal lines keep their values as written until a compaction
+        return df if table in self.journaled_tables else as_read_back(df)
+
+    def read_table(self, table):
+        """Read a whole table into a DataFrame, reusing the cached parse while the file is unchanged"""
+        path = self.path_for(table)
+        if table not in self.journaled_tables:
+            return self._read_workbook(path)
+        # Hold the lock so a concurrent compaction can't be seen half done
+        with file_lock(path):
+            df = self._read_workbook(path)
+            journal = self._read_journal(table)
+        if not journal.empty:
+            df = pd.concat([df, journal], ignore_index=True) if not df.empty else journal
+        return df
+
+    def _read_workbook(self, path):
+        """Read a workbook through the shared cache, preferring its snapshot while the snapshot matches it"""
+        signature = file_signature(path)
+
+        def load():
+            df = self._read_snapshot(path, signature)
+            if df is None:
+                df = read_workbook(path)
+                # The workbook was written or edited elsewhere; snapshot it for the next cold read
+                self._write_snapshot(path, signature, df)
+            return df
+
+        return table_cache.get(path, signature, load)
+
+    def _read_snapshot(self, path, signature):
+        """Load a workbook's snapshot if it was taken of the workbook as it is now, or get None"""
+        if signature is None:
+            return None
+        try:
+            with open(self.snapshot_path(path), 'rb') as f:
+                version, snapshot_signature, df = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Error reading snapshot for {path}: {e}")
+            return None
+        if version != SNAPSHOT_VERSION or snapshot_signature != signature:
+            return None
+        return df
+
+    def _write_snapshot(self, path, signature, df):
+        """Save a frame as the snapshot of a workbook with the given signature"""
+        if signature is None:
+            return
+        try:
+            def write(temp_path):
+                with open(temp_path, 'wb') as f:
+                    pickle.dump((SNAPSHOT_VERSION, signature, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            atomic_write(self.snapshot_path(path), write, '.pkl')
+        except Exception as e:
+            logging.error(f"Error writing snapshot for {path}: {e}")
+
+    def _read_journal(self, table):
+        """Read the rows appended to a table's journal since the last compaction"""
+        path = self.journal_path(table)
+
+        def load():
+            # Skip a trailing line another writer has not finished yet
+            with open(path, encoding='utf-8') as f:
+                return pd.DataFrame([json.loads(line) for line in f if line.endswith('\n') and line.strip()])
+
+        signature = file_signature(path)
+        if signature is None:
+            return pd.DataFrame()
+        return table_cache.get(path, signature, load)
+
+    def write_table(self, table, df):
+        """Replace the contents of a table"""
+        with file_lock(self.path_for(table)):
+            before = self.signature(table)
+            self._save(table, df)
+            self._notify(table, before, self.signature(table), [('replace', df)])
+
+    def _save(self, table, df):
+        """Atomically replace a table's workbook and clear its journal; the caller holds the lock"""
+        path = self.path_for(table)
+        atomic_write(path, lambda temp_path: df.to_excel(temp_path, index=False, engine='openpyxl'), '.xlsx')
+        table_cache.invalidate(path)
+        # Snapshot the rows as a parse of the new workbook would return them, and
+        # prime the cache with them so this process doesn't reparse its own write
+        signature = file_signature(path)
+        df = as_read_back(df)
+        self._write_snapshot(path, signature, df)
+        table_cache.get(path, signature, lambda: df)
+        if table in self.journaled_tables and os.path.exists(self.journal_path(table)):
+            os.remove(self.journal_path(table))
+            table_cache.invalidate(self.journal_path(table))
+
+    def _load_for_update(self, table):
+        """Read a table for a read-modify-write, treating a missing workbook as empty"""
+        try:
+            return self.read_table(table)
+        except FileNotFoundError:
+            return pd.DataFrame()
+
+    def _mutate(self, table, mutation, change):
+        """Run a read-modify-write through the shared write coordinator"""
+        state = {}
+
+        def load():
+            state['before'] = self.signature(table)
+            return self._load_for_update(table)
+
+        def save(df, changes):
+            self._save(table, df)
+            self._notify(table, state['before'], self.signature(table), changes)
+
+        return write_coordinator.submit(self.path_for(table), load, save, mutation, change)
+
+    def append_rows(self, table, rows):
+        """Append a list of row dicts to a table"""
+        if not rows:
+            return
+        if table in self.journaled_tables and self.exists(table):
+            self._append_journal(table, rows)
+            return
+        new_rows = pd.DataFrame(rows)
+        self._mutate(table, lambda df: (
+            pd.concat([df, new_rows], ignore_index=True) if not df.empty else new_rows, None
+        ), ('append', rows))
+
+    def append_stream(self, table, chunks):
+        """Append chunks of row dicts in one atomic rewrite of the workbook, returning the number appended
+
+        The workbook is copied row by row into a new one with openpyxl's
+        streaming modes and the chunks are written after it, so memory stays
+        bounded by a chunk however large the table or the import is. If a
+        chunk raises, the workbook is left as it was.
+        """
+        path = self.path_for(table)
+        state = {'count': 0, 'changes': []}
+        with file_lock(path):
+            stream = self._stream_changes(chunks, state)
+            first = next(stream, None)
+            if first is None:
+                return 0
+            if table in self.journaled_tables:
+                self.compact(table)
+            before = self.signature(table)
+
+            def write(temp_path):
+                source = openpyxl.load_workbook(path, read_only=True) if os.path.exists(path) else None
+                try:
+                    existing = source.active.iter_rows(values_only=True) if source is not None else iter(())
+                    header = [column for column in next(existing, ()) if column is not None]
+                    header += [column for column in first[0] if column not in header]
+                    workbook = openpyxl.Workbook(write_only=True)
+                    sheet = workbook.create_sheet('Sheet1')
+                    sheet.append(header)
+                    for values in existing:
+                        sheet.append(list(values[:len(header)]) + [None] * (len(header) - len(values)))
+                    for rows in itertools.chain([first], stream):
+                        for row in rows:
+                            sheet.append([row.get(column) for column in header])
+                    workbook.save(temp_path)
+                finally:
+                    if source is not None:
+                        source.close()
+
+            atomic_write(path, write, '.xlsx')
+            table_cache.invalidate(path)
+            self._notify(table, before, self.signature(table), state['changes'] or [('reload',)])
+        return state['count']
+
+    def delete_rows(self, table, column, value, limit=None):
+        """Delete rows where column equals value, returning the number removed"""
+        def delete(df):
+            matches = df.index[df[column] == value]
+            if limit is not None:
+                matches = matches[:limit]
+            if len(matches) == 0:
+                return None, 0
+            return df.drop(matches), len(matches)
+
+        return self._mutate(table, delete, ('delete', column, value, limit))
+
+    def _append_journal(self, table, rows):
+        """Append rows to a table's journal in one write, compacting once it grows large"""
+        path = self.journal_path(table)
+        lines = ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+        with file_lock(self.path_for(table)):
+            before = self.signature(table)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            table_cache.invalidate(path)
+            self._notify(table, before, self.signature(table), [('append', rows)])
+            if self._journal_length(table) >= self.compact_threshold:
+                self.compact(table)
+
+    def _journal_length(self, table):
+        """Count the rows waiting in a table's journal"""
+        try:
+            with open(self.journal_path(table), 'rb') as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def compact(self, table):
+        """Fold a table's journal back into its workbook"""
+        with file_lock(self.path_for(table)):
+            if table in self.journaled_tables and os.path.exists(self.journal_path(table)):
+                before = self.signature(table)
+                self._save(table, self.read_table(table))
+                self._notify(table, before, self.signature(table), [])
+                logging.info(f"Compacted {table} journal into {self.path_for(table)}")
+
+    def next_id(self, sequence, seed=None):
+        """Allocate the next value of a persisted monotonic counter"""
+        path = os.path.join(self.directory, f'{sequence}.seq')
+        with file_lock(path):
+            try:
+                with open(path) as f:
+                    current = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                current = seed() if seed else 0
+            value = current + 1
+
+            def write(temp_path):
+                with open(temp_path, 'w') as f:
+                    f.write(str(value))
+
+            atomic_write(path, write)
+        return value
+
+    def import_excel(self, table, path=None):
+        """Load a workbook into a table"""
+        source = path or self.path_for(table)
+        if os.path.abspath(source) != os.path.abspath(self.path_for(table)):
+            self.write_table(table, pd.read_excel(source, engine='openpyxl'))
+
+    def export_excel(self, table, path=None):
+        """Dump a table to a workbook"""
+        target = path or self.path_for(table)
+        if os.path.abspath(target) != os.path.abspath(self.path_for(table)):
+            self.read_table(table).to_excel(target, index=False, engine='openpyxl')
+
+
+@instrument('io', TIMED_METHODS)
+def _numeric_affinity(value, integer):
+    """Convert a value the way SQLite stores it in a column of INTEGER or REAL affinity"""
+    if not isinstance(value, str):
+        return value
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if not math.isfinite(number):
+        return value
+    return int(number) if integer and number.is_integer() else number
+
+
+class SQLiteStorage(_ChangeFeed):
+    """Storage backend that keeps every table in a single SQLite database"""
+
+    backend = SQLITE_BACKEND
+
+    def __init__(self, db_path='smartpantry.db', directory='.'):
+        self._listeners = {}
+        self.db_path = db_path
+        self.directory = directory
+        self._local = threading.local()
+
+    def _connect(self):
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS "_versions" (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def path_for(self, table):
+        """Get the workbook path used for importing and exporting a table"""
+        return os.path.join(self.directory, f'{table}.xlsx')
+
+    def exists(self, table):
+        """Check whether a table has been created"""
+        row = self._connect().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        return row is not None
+
+    def _create_indexes(self, conn, table, columns):
+        """Create the configured indexes for a table"""
+        for column in TABLE_INDEXES.get(table, []):
+            if column in columns:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table}_{column}" ON "{table}" ("{column}")'
+                )
+
+    def _column_types(self, df):
+        """Declare text and still-empty columns without affinity so SQLite keeps values as given"""
+        return {
+            column: '' for column in df.columns
+            if df.empty or not pd.api.types.is_numeric_dtype(df[column])
+        }
+
+    def signature(self, table):
+        """Get the signature that changes whenever a write through any storage instance touches the table"""
+        row = self._connect().execute('SELECT version FROM "_versions" WHERE name = ?', (table,)).fetchone()
+        return (row[0] if row else 0,)
+
+    def _bump_version(self, conn, table):
+        """Advance a table's version inside the caller's transaction, returning the signatures around it"""
+        row = conn.execute('SELECT version FROM "_versions" WHERE name = ?', (table,)).fetchone()
+        version = row[0] if row else 0
+        conn.execute('INSERT OR REPLACE INTO "_versions" (name, version) VALUES (?, ?)', (table, version + 1))
+        return (version,), (version + 1,)
+
+    def _cache_key(self, table):
+        """Get the shared cache key for a table"""
+        return f'{self.db_path}:{table}'
+
+    def read_back(self, table, df):
+        """Convert a frame of appended rows to what reading them back from the table would give"""
+        declared = {row[1]: row[2] for row in self._connect().execute(f'PRAGMA table_info("{table}")')}
+        converted = {}
+        for column in df.columns:
+            if declared.get(column) in ('INTEGER', 'REAL') and not pd.api.types.is_numeric_dtype(df[column]):
+                integer = declared[column] == 'INTEGER'
+                converted[column] = [_numeric_affinity(value, integer) for value in df[column].tolist()]
+        return df.assign(**converted) if converted else df
+
+    def read_table(self, table):
+        """Read a whole table into a DataFrame in insertion order, reusing the cached read while unchanged"""
+        return table_cache.get(
+            self._cache_key(table),
+            self.signature(table),
+            lambda: pd.read_sql_query(f'SELECT * FROM "{table}" ORDER BY rowid', self._connect())
+        )
+
+    def write_table(self, table, df):
+        """Replace the contents of a table"""
+        conn = self._connect()
+        with conn:
+            df.to_sql(table, conn, if_exists='replace', index=False, dtype=self._column_types(df))
+            self._create_indexes(conn, table, df.columns)
+            before, after = self._bump_version(conn, table)
+        table_cache.invalidate(self._cache_key(table))
+        self._notify(table, before, after, [('replace', df)])
+
+    def append_rows(self, table, rows):
+        """Insert a list of row dicts in a single transaction"""
+        if not rows:
+            return
+        if not self.exists(table):
+            self.write_table(table, pd.DataFrame(rows))
+            return
+        columns = list(rows[0].keys())
+        column_sql = ', '.join(f'"{c}"' for c in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                f'INSERT INTO "{table}" ({column_sql}) VALUES ({placeholders})',
+                [tuple(row.get(c) for c in columns) for row in rows]
+            )
+            before, after = self._bump_version(conn, table)
+        table_cache.invalidate(self._cache_key(table))
+        self._notify(table, before, after, [('append', rows)])
+
+    def append_stream(self, table, chunks):
+        """Insert chunks of row dicts in a single transaction, returning the number appended
+
+        Each chunk is inserted as it arrives, so memory stays bounded by a chunk.
+        If a chunk raises, the transaction is rolled back.
+        """
+        state = {'count': 0, 'changes': []}
+        stream = self._stream_changes(chunks, state)
+        first = next(stream, None)
+        if first is None:
+            return 0
+        if not self.exists(table):
+            self.write_table(table, pd.DataFrame(first).iloc[:0])
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for rows in itertools.chain([first], stream):
+                columns = list(rows[0].keys())
+                column_sql = ', '.join(f'"{c}"' for c in columns)
+                placeholders = ', '.join('?' for _ in columns)
+                conn.executemany(
+                    f'INSERT INTO "{table}" ({column_sql}) VALUES ({placeholders})',
+                    [tuple(row.get(c) for c in columns) for row in rows]
+                )
+            before, after = self._bump_version(conn, table)
+        table_cache.invalidate(self._cache_key(table))
+        self._notify(table, before, after, state['changes'] or [('reload',)])
+        return state['count']
+
+    def delete_rows(self, table, column, value, limit=None):
+        """Delete rows where column equals value, returning the number removed"""
+        conn = self._connect()
+        limit_sql = ' LIMIT ?' if limit is not None else ''
+        params = (value, limit) if limit is not None else (value,)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                f'DELETE FROM "{table}" WHERE rowid IN '
+                f'(SELECT rowid FROM "{table}" WHERE "{column}" = ? ORDER BY rowid{limit_sql})',
+                params
+            )
+            before, after = self._bump_version(conn, table)
+        table_cache.invalidate(self._cache_key(table))
+        self._notify(table, before, after, [('delete', column, value, limit)])
+        return cursor.rowcount
+
+    def next_id(self, sequence, seed=None):
+        """Allocate the next value of a persisted monotonic counter"""
+        conn = self._connect()
+        conn.execute('CREATE TABLE IF NOT EXISTS "_sequences" (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.commit()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT value FROM "_sequences" WHERE name = ?', (sequence,)).fetchone()
+            current = row[0] if row else (seed() if seed else 0)
+            conn.execute(
+                'INSERT OR REPLACE INTO "_sequences" (name, value) VALUES (?, ?)', (sequence, current + 1)
+            )
+        return current + 1
+
+    def compact(self, table):
+        """Export a table back to its workbook; rows are already stored in place"""
+        self.export_excel(table)
+
+    def import_excel(self, table, path=None):
+        """Load a workbook into a table, replacing its contents"""
+        df = pd.read_excel(path or self.path_for(table), engine='openpyxl')
+        self.write_table(table, df)
+        logging.info(f"Imported {len(df)} rows into {table}")
+
+    def export_excel(self, table, path=None):
+        """Dump a table to a workbook"""
+        df = self.read_table(table)
+        df.to_excel(path or self.path_for(table), index=False, engine='openpyxl')
+        logging.info(f"Exported {len(df)} rows from {table}")
+
+    def import_missing_tables(self):
+        """Import existing workbooks for tables not yet present in the database"""
+        for table in TABLES:
+            if not self.exists(table) and os.path.exists(self.path_for(table)):
+                try:
+                    self.import_excel(table)
+                except Exception as e:
+                    logging.error(f"Error importing {table}: {e}")
+
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(backend=None):
+    """Get the shared storage backend selected by PANTRY_STORAGE_BACKEND"""
+    backend = (backend or os.environ.get('PANTRY_STORAGE_BACKEND', EXCEL_BACKEND)).lower()
+    with _storages_lock:
+        if backend not in _storages:
+            if backend == SQLITE_BACKEND:
+                storage = SQLiteStorage(os.environ.get('PANTRY_SQLITE_PATH', 'smartpantry.db'))
+                storage.import_missing_tables()
+            elif backend == EXCEL_BACKEND:
+                storage = ExcelStorage()
+            else:
+                raise ValueError(f"Unknown storage backend: {backend}")
+            _storages[backend] = storage
+        return _storages[backend]
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python storage.py import|export|compact [table ...]
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'export', 'compact'):
+        print("Usage: python storage.py import|export|compact [table ...]")
+        sys.exit(1)
+    command = sys.argv[1]
+    if command == 'compact':
+        # Compact the configured backend, defaulting to the append-only tables
+        for name in sys.argv[2:] or JOURNALED_TABLES:
+            get_storage().compact(name)
+        sys.exit(0)
+    sqlite_storage = get_storage(SQLITE_BACKEND)
+    for name in sys.argv[2:] or TABLES:
+        if command == 'import':
+            sqlite_storage.import_excel(name)
+        else:
+            sqlite_storage.export_excel(name)
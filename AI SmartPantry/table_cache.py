@@ -0,0 +1,59 @@
+import threading
+
+
+class TableCache:
+    """In-process cache of parsed tables keyed on the file signature they were read from"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, signature, loader):
+        """Return a copy of the cached frame for key, calling loader on a miss or stale signature"""
+        if signature is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self.hits += 1
+                    return entry[1].copy()
+                self.misses += 1
+        else:
+            with self._lock:
+                self.misses += 1
+
+        df = loader()
+        if signature is not None:
+            with self._lock:
+                self._entries[key] = (signature, df)
+        return df.copy()
+
+    def invalidate(self, key):
+        """Drop the cached frame for key after a write"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached frame"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Get hit/miss counters for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Shared by every storage backend so all manager reads go through one cache
+table_cache = TableCache()
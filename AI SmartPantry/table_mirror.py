@@ -0,0 +1,242 @@
+import threading
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+def parse_dates(values):
+    """Parse a column of dates, ISO 8601 in one pass and any other spelling such as 10/20/2024 after it"""
+    dates = pd.to_datetime(values, errors='coerce', format='ISO8601')
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], errors='coerce', format='mixed')
+    return dates
+
+
+def frame_records(df):
+    """Convert a frame to a list of row dicts column-at-a-time, which is faster than to_dict"""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
+
+
+def _format_dates(values):
+    """Format a datetime column as YYYY-MM-DD strings, with NaN where the date is missing"""
+    days = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    formatted = days.astype(str).astype(object)
+    formatted[np.isnat(days)] = np.nan
+    return formatted.tolist()
+
+
+class LazyRecords:
+    """Read-only sequence of row dicts built from a mirror frame only when a row is accessed
+
+    Taking its length or slicing it costs nothing per row, so a template that
+    only counts the rows never materializes them.
+    """
+
+    def __init__(self, mirror, frame, fields=None):
+        self.mirror = mirror
+        self.frame = frame if fields is None else frame[[field for field in fields if field in frame.columns]]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return LazyRecords(self.mirror, self.frame.iloc[position])
+        return self.mirror.materialize(self.frame.iloc[[position]])[0]
+
+    def __iter__(self):
+        return iter(self.mirror.materialize(self.frame))
+
+
+class TableMirror:
+    """In-memory copy of one table that follows the storage change feed and keeps derived indexes current
+
+    Rows carry stable integer labels that survive appends and deletes, so an
+    index can refer to a row by label without tracking positions. Writes made
+    through this process's storage are applied to the mirror and its indexes
+    as deltas. Anything else, such as another worker's write or a replaced
+    table, shows up as a signature mismatch and the mirror is rebuilt on the
+    next sync.
+
+    An index is any object with add(frame), remove(frame) and clear() methods.
+    The frames it receives are labelled slices of the mirror. Query an index
+    while holding the mirror's lock, together with the frame it describes.
+
+    Repetitive text columns can be kept as categoricals and date columns as
+    parsed datetimes, which makes the mirror far smaller than the row dicts it
+    replaces. Use materialize to turn a slice back into row dicts shaped like
+    a table read, with dates as YYYY-MM-DD strings and, if a fill function is
+    given, missing cells replaced column by column.
+    """
+
+    def __init__(self, storage, table, categorical=(), dates=(), fill=None):
+        self.storage = storage
+        self.table = table
+        self.categorical = list(categorical)
+        self.dates = list(dates)
+        self.fill = fill
+        self.lock = threading.RLock()
+        self.frame = None
+        self.signature = None
+        self.indexes = []
+        self.next_label = 0
+        self.rebuilds = 0
+        self.deltas = 0
+        storage.subscribe(table, self._on_change)
+
+    def add_index(self, index):
+        """Attach a derived index, feeding it the rows already mirrored"""
+        with self.lock:
+            self.indexes.append(index)
+            if self.frame is not None:
+                index.add(self.frame)
+
+    def sync(self):
+        """Bring the mirror up to date with storage and return its frame"""
+        signature = self.storage.signature(self.table)
+        with self.lock:
+            if self.frame is not None and signature is not None and signature == self.signature:
+                return self.frame
+        # Read outside the lock so a writer notifying us is never blocked behind the read
+        df = self.storage.read_table(self.table)
+        after = self.storage.signature(self.table)
+        with self.lock:
+            # A write that landed during the read may or may not be in df, so
+            # leave the signature unset and let the next sync read again
+            self._rebuild(df, signature if after == signature else None)
+            return self.frame
+
+    def materialize(self, frame, fields=None):
+        """Build row dicts for a slice of the mirror, limited to fields if given"""
+        if fields is not None:
+            frame = frame[[field for field in fields if field in frame.columns]]
+        dates = {column: _format_dates(frame[column]) for column in self.dates if column in frame.columns}
+        if dates:
+            frame = frame.assign(**dates)
+        if self.fill is not None:
+            frame = self.fill(frame)
+        return frame_records(frame)
+
+    def page(self, limit, cursor=None, fields=None):
+        """Get (rows, next_cursor) for up to limit rows after cursor in storage order
+
+        A cursor names the last row already served by its label, so rows
+        removed or added earlier in the table don't shift the next page. If
+        the mirror has been rebuilt since the cursor was issued, the labels
+        have changed and the position it also records is used instead. The
+        next cursor is None once the last row has been served.
+        """
+        self.sync()
+        with self.lock:
+            frame = self.frame
+            start = self._cursor_position(frame, cursor)
+            chunk = frame.iloc[start:start + limit]
+            end = start + len(chunk)
+            next_cursor = f'{self.rebuilds}.{frame.index[end - 1]}.{end}' if end < len(frame) else None
+        return self.materialize(chunk, fields), next_cursor
+
+    def _cursor_position(self, frame, cursor):
+        """Get the position of the first row after a cursor"""
+        if not cursor:
+            return 0
+        generation, label, position = (int(part) for part in str(cursor).split('.'))
+        if generation == self.rebuilds:
+            # Labels only grow in storage order, so the index is sorted
+            return int(frame.index.searchsorted(label, side='right'))
+        return min(position, len(frame))
+
+    def records(self, fields=None):
+        """Get the mirrored rows as a lazily materialized sequence"""
+        self.sync()
+        with self.lock:
+            return LazyRecords(self, self.frame, fields)
+
+    def stats(self):
+        """Get rebuild and delta counters for the mirror"""
+        with self.lock:
+            return {
+                'rows': 0 if self.frame is None else len(self.frame),
+                'bytes': 0 if self.frame is None else int(self.frame.memory_usage(deep=True).sum()),
+                'rebuilds': self.rebuilds,
+                'deltas': self.deltas
+            }
+
+    def _rebuild(self, df, signature):
+        """Replace the mirrored rows and rebuild every index from them"""
+        self.frame = self._compact(self._label(df))
+        self.signature = signature
+        self.rebuilds += 1
+        for index in self.indexes:
+            index.clear()
+            index.add(self.frame)
+
+    def _label(self, df):
+        """Give a frame of new rows the next free labels"""
+        df = df.set_axis(pd.RangeIndex(self.next_label, self.next_label + len(df)))
+        self.next_label += len(df)
+        return df
+
+    def _compact(self, df):
+        """Convert the configured columns to categoricals and parsed dates"""
+        converted = {}
+        for column in self.categorical:
+            if column in df.columns:
+                converted[column] = df[column].astype('category')
+        for column in self.dates:
+            if column in df.columns:
+                converted[column] = parse_dates(df[column])
+        return df.assign(**converted) if converted else df
+
+    def _on_change(self, table, before, after, changes):
+        """Apply a write made through storage, or mark the mirror stale if it missed one"""
+        with self.lock:
+            if self.frame is None or self.signature is None or self.signature == after:
+                return
+            if self.signature != before:
+                self.signature = None
+                return
+            for change in changes:
+                if change[0] == 'append':
+                    self._append(self.storage.read_back(table, pd.DataFrame(change[1])))
+                elif change[0] == 'delete':
+                    self._delete(*change[1:])
+                else:
+                    self.signature = None
+                    return
+            self.signature = after
+            self.deltas += 1
+
+    def _append(self, rows):
+        """Mirror appended rows"""
+        rows = self._compact(self._label(rows))
+        if self.frame.empty:
+            self.frame = rows
+        else:
+            combined = pd.concat([self.frame, rows])
+            # Rows that bring new categories come back as object columns, so merge the categories
+            for column in self.categorical:
+                if column in combined.columns and not isinstance(combined[column].dtype, pd.CategoricalDtype):
+                    try:
+                        merged = union_categoricals([self.frame[column], rows[column]], ignore_order=True)
+                        combined[column] = merged
+                    except (KeyError, TypeError):
+                        combined[column] = combined[column].astype('category')
+            self.frame = combined
+        for index in self.indexes:
+            index.add(rows)
+
+    def _delete(self, column, value, limit):
+        """Mirror a delete by replaying it against the mirrored rows, which are in storage order"""
+        if column not in self.frame.columns:
+            return
+        labels = self.frame.index[self.frame[column] == value]
+        if limit is not None:
+            labels = labels[:limit]
+        if len(labels) == 0:
+            return
+        removed = self.frame.loc[labels]
+        self.frame = self.frame.drop(labels)
+        for index in self.indexes:
+            index.remove(removed)
@@ -0,0 +1,171 @@
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; fall back to in-process locking only
+    fcntl = None
+
+
+class _PathLock:
+    """Re-entrant lock for one path, held across threads and worker processes"""
+
+    def __init__(self, path):
+        self.path = f'{path}.lock'
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def _get_path_lock(path):
+    """Get the shared lock object for a path"""
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        if key not in _path_locks:
+            _path_locks[key] = _PathLock(key)
+        return _path_locks[key]
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path against other threads and processes
+
+    Threads in this process are serialized by an RLock, and processes by an
+    flock on a sidecar <path>.lock file. The lock is re-entrant so that a
+    locked operation can call another one on the same path.
+    """
+    lock = _get_path_lock(path)
+    with lock.thread_lock:
+        if lock.depth == 0:
+            lock.handle = open(lock.path, 'a')
+            if fcntl is not None:
+                fcntl.flock(lock.handle, fcntl.LOCK_EX)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(lock.handle, fcntl.LOCK_UN)
+                lock.handle.close()
+                lock.handle = None
+
+
+def _read_umask():
+    """Get the process umask, which can only be read by setting it, so set it straight back"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import, since setting the umask to read it would race with threads creating files
+_UMASK = _read_umask()
+
+
+def _file_mode(path):
+    """Get the permission bits a rewrite of path should have"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path, write, suffix=''):
+    """Write a file through a temporary file in the same directory and os.replace it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        write(temp_path)
+        # mkstemp creates the file owner-only; keep the target's mode, or the umask default for a new file
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class _PendingMutation:
+    """A queued read-modify-write waiting for the next flush"""
+
+    def __init__(self, mutation, change):
+        self.mutation = mutation
+        self.change = change
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class WriteCoordinator:
+    """Serializes read-modify-write mutations per file and flushes concurrent ones together
+
+    Each mutation is a function taking the current frame and returning
+    (new_frame, result), with new_frame None when nothing changed. Callers
+    queue their mutation and then wait for the file lock. Whoever gets the
+    lock first loads the frame once, applies every queued mutation in order,
+    and saves once. The waiting callers then find their mutation already
+    applied. The save callback also receives the change descriptions of the
+    mutations that altered the frame, in the order they were applied.
+    """
+
+    def __init__(self):
+        self._queues = {}
+        self._guard = threading.Lock()
+        self.flushes = 0
+        self.mutations = 0
+
+    def submit(self, path, load, save, mutation, change=None):
+        """Apply a mutation to the file at path and return its result"""
+        pending = _PendingMutation(mutation, change)
+        with self._guard:
+            self._queues.setdefault(path, []).append(pending)
+
+        with file_lock(path):
+            if not pending.done:
+                with self._guard:
+                    batch = self._queues.pop(path, [])
+                self._flush(batch, load, save)
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _flush(self, batch, load, save):
+        """Apply a batch of mutations to one load of the frame and save it once"""
+        try:
+            df = load()
+            changes = []
+            for pending in batch:
+                try:
+                    new_df, pending.result = pending.mutation(df)
+                except Exception as e:
+                    pending.error = e
+                    continue
+                if new_df is not None:
+                    df = new_df
+                    changes.append(pending.change)
+            if changes:
+                save(df, changes)
+        except Exception as e:
+            for pending in batch:
+                if pending.error is None:
+                    pending.error = e
+        finally:
+            for pending in batch:
+                pending.done = True
+            with self._guard:
+                self.flushes += 1
+                self.mutations += len(batch)
+
+
+# Shared by every storage backend so all writes to a file go through one queue
+write_coordinator = WriteCoordinator()